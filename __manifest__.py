@@ -35,8 +35,10 @@ Fonctionnalités :
     ],
     'data': [
         'data/hr_faction_data.xml',
+        'data/faction_coverage_data.xml',
         'data/hr_formation_data.xml',
         'data/equipement_data.xml',
+        'data/mail_activity_data.xml',
         'data/cron_data.xml',
         'security/ir.model.access.csv',
         'views/hr_faction_views.xml',
@@ -46,6 +48,17 @@ Fonctionnalités :
         'views/visite_medicale_views.xml',
         'views/res_config_settings_views.xml',
         'views/equipement_views.xml',
+        'views/equipement_kit_views.xml',
+        'views/equipement_forecast_views.xml',
+        'views/deduction_views.xml',
+        'views/roster_shift_views.xml',
+        'views/faction_coverage_views.xml',
+        'wizard/formation_enrollment_wizard_views.xml',
+        'wizard/compliance_matrix_export_wizard_views.xml',
+        'wizard/equipement_kit_issue_wizard_views.xml',
+        'wizard/employee_import_wizard_views.xml',
+        'wizard/roster_generate_wizard_views.xml',
+        'report/ange_employee_compliance_summary_views.xml',
     ],
     'installable': True,
     'auto_install': False,
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import http
+from odoo.http import request, content_disposition
+
+# Au-delà de cette taille, le fichier généré est écrit sur disque
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+
+class ComplianceMatrixController(http.Controller):
+
+    @http.route('/ange_sec_employee/compliance_matrix/<int:wizard_id>', type='http', auth='user')
+    def export_compliance_matrix(self, wizard_id, **kwargs):
+        """Télécharger la matrice de conformité préparée par l'assistant"""
+        wizard = request.env['ange.compliance.matrix.export.wizard'].browse(wizard_id).exists()
+        if not wizard:
+            raise request.not_found()
+
+        fileobj = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        filename, mimetype = wizard._write_matrix(fileobj)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        return request.make_response(
+            wrap_file(request.httprequest.environ, fileobj),
+            headers=[
+                ('Content-Type', mimetype),
+                ('Content-Length', size),
+                ('Content-Disposition', content_disposition(filename)),
+            ],
+        )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from . import ange_settings
 from . import visite_medicale
 from . import hr_faction
 from . import hr_formation
@@ -8,3 +9,9 @@ from . import hr_employee
 from . import res_config_settings
 from . import equipement
 from . import employee_equipement
+from . import equipement_kit
+from . import equipement_forecast
+from . import deduction_periode
+from . import deduction_ligne
+from . import roster_shift
+from . import faction_coverage
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api, tools
+from odoo.tools import frozendict
+
+PARAM_PREFIX = 'ange_sec_employee.'
+
+# Paramètres du module : nom -> (type, valeur par défaut)
+SETTINGS_SPEC = {
+    'jours_alerte_recyclage': (int, 30),
+    'taille_lot_cron': (int, 1000),
+    'jours_alerte_documents': (int, 30),
+    'jours_alerte_equipement': (int, 30),
+    'mois_validite_visite': (int, 12),
+    'heures_repos_min': (int, 11),
+    'responsable_documents_id': (int, 0),
+}
+
+
+def get_ange_settings(env):
+    """Retourner les paramètres typés du module (mis en cache par registre)"""
+    return env['ange.settings']._get_settings()
+
+
+class AngeSettings(models.AbstractModel):
+    """Accès en cache aux paramètres ange_sec_employee.* de ir.config_parameter"""
+    _name = 'ange.settings'
+    _description = 'Paramètres Ange Security'
+
+    @api.model
+    @tools.ormcache()
+    def _get_settings(self):
+        """Lire et convertir tous les paramètres du module en une seule requête"""
+        params = {
+            param['key'][len(PARAM_PREFIX):]: param['value']
+            for param in self.env['ir.config_parameter'].sudo().search_read(
+                [('key', '=like', PARAM_PREFIX + '%')], ['key', 'value']
+            )
+        }
+        values = {}
+        for name, (value_type, default) in SETTINGS_SPEC.items():
+            try:
+                values[name] = value_type(params[name])
+            except (KeyError, TypeError, ValueError):
+                values[name] = default
+        return frozendict(values)
+
+    @api.model
+    def _invalidate_settings(self):
+        """Vider le cache des paramètres (après modification de la configuration)"""
+        self.env.registry.clear_cache()
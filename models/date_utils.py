@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import operator as py_operator
+from datetime import timedelta
+
+from odoo import _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+
+OPERATORS = {
+    '=': py_operator.eq,
+    '!=': py_operator.ne,
+    '<': py_operator.lt,
+    '<=': py_operator.le,
+    '>': py_operator.gt,
+    '>=': py_operator.ge,
+}
+
+
+def days_until_domain(date_field, operator, value, today):
+    """Traduire une condition « nombre de jours avant date_field » en condition sur la date
+
+    Les champs « jours avant » valent 0 quand la date est vide : ces lignes
+    sont incluses si 0 satisfait la condition, afin que la recherche renvoie
+    les mêmes enregistrements que le calcul Python.
+    """
+    if operator not in OPERATORS:
+        raise UserError(_('Opérateur non supporté pour ce champ : %s') % operator)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise UserError(_('Valeur non supportée pour ce champ : %s') % value)
+
+    domain = [
+        (date_field, operator, today + timedelta(days=value)),
+        (date_field, '!=', False),
+    ]
+    if OPERATORS[operator](0, value):
+        domain = expression.OR([domain, [(date_field, '=', False)]])
+    return domain
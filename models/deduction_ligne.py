@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class DeductionLigne(models.Model):
+    """Ligne de déduction de paie par employé et par équipement"""
+    _name = 'ange.deduction.ligne'
+    _description = 'Ligne de Déduction Équipement'
+    _order = 'periode_id desc, employee_id, equipement_id'
+
+    periode_id = fields.Many2one(
+        'ange.deduction.periode',
+        string='Période',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    employee_id = fields.Many2one(
+        'hr.employee',
+        string='Employé',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    matricule_agent = fields.Char(
+        string='Matricule agent',
+        help='Matricule de l\'agent au moment de la génération'
+    )
+
+    department_id = fields.Many2one(
+        related='employee_id.department_id',
+        string='Département',
+        store=True
+    )
+
+    equipement_id = fields.Many2one(
+        'ange.equipement',
+        string='Équipement',
+        required=True,
+        ondelete='restrict'
+    )
+
+    quantite = fields.Integer(
+        string='Quantité',
+        default=1,
+        help='Nombre d\'équipements remis sur la période'
+    )
+
+    montant_unitaire = fields.Float(
+        string='Montant unitaire',
+        help='Montant déductible de l\'équipement au moment de la génération'
+    )
+
+    montant = fields.Float(
+        string='Montant',
+        compute='_compute_montant',
+        store=True
+    )
+
+    state = fields.Selection(related='periode_id.state', string='État')
+
+    @api.depends('quantite', 'montant_unitaire')
+    def _compute_montant(self):
+        """Calculer le montant de la ligne"""
+        for ligne in self:
+            ligne.montant = ligne.quantite * ligne.montant_unitaire
+
+    def _check_periode_ouverte(self):
+        """Refuser toute modification sur une période clôturée"""
+        if any(ligne.periode_id.state == 'cloture' for ligne in self):
+            raise UserError(_('Les lignes d\'une période clôturée ne peuvent plus être modifiées.'))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        periode_ids = {vals['periode_id'] for vals in vals_list if vals.get('periode_id')}
+        if self.env['ange.deduction.periode'].browse(periode_ids).filtered(lambda p: p.state == 'cloture'):
+            raise UserError(_('Impossible d\'ajouter des lignes à une période clôturée.'))
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self._check_periode_ouverte()
+        return super().write(vals)
+
+    def unlink(self):
+        self._check_periode_ouverte()
+        return super().unlink()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError, UserError
+
+
+class DeductionPeriode(models.Model):
+    """Période de paie pour le calcul des déductions d'équipements"""
+    _name = 'ange.deduction.periode'
+    _description = 'Période de Déductions Équipements'
+    _order = 'date_debut desc'
+
+    name = fields.Char(
+        string='Période',
+        required=True,
+        help='Libellé de la période de paie (ex : Mars 2025)'
+    )
+
+    date_debut = fields.Date(
+        string='Date de début',
+        required=True,
+        help='Premier jour de la période de paie'
+    )
+
+    date_fin = fields.Date(
+        string='Date de fin',
+        required=True,
+        help='Dernier jour de la période de paie'
+    )
+
+    state = fields.Selection([
+        ('brouillon', 'Brouillon'),
+        ('cloture', 'Clôturée')
+    ], string='État', default='brouillon', required=True, readonly=True,
+       help='Une période clôturée ne peut plus être recalculée ni modifiée')
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    ligne_ids = fields.One2many(
+        'ange.deduction.ligne',
+        'periode_id',
+        string='Lignes de déduction'
+    )
+
+    montant_total = fields.Float(
+        string='Montant total',
+        compute='_compute_totaux',
+        store=True,
+        help='Montant total déduit sur la période'
+    )
+
+    nb_employes = fields.Integer(
+        string='Nombre d\'employés',
+        compute='_compute_totaux',
+        store=True,
+        help='Nombre d\'employés concernés par une déduction sur la période'
+    )
+
+    @api.depends('ligne_ids.montant', 'ligne_ids.employee_id')
+    def _compute_totaux(self):
+        """Calculer les totaux de la période"""
+        for periode in self:
+            periode.montant_total = sum(periode.ligne_ids.mapped('montant'))
+            periode.nb_employes = len(periode.ligne_ids.employee_id)
+
+    @api.constrains('date_debut', 'date_fin', 'company_id')
+    def _check_dates(self):
+        """Vérifier la cohérence des dates et l'absence de chevauchement"""
+        for periode in self:
+            if periode.date_debut > periode.date_fin:
+                raise models.ValidationError(
+                    _('La date de début doit être antérieure à la date de fin.')
+                )
+            if self.search_count([
+                ('id', '!=', periode.id),
+                ('company_id', '=', periode.company_id.id),
+                ('date_debut', '<=', periode.date_fin),
+                ('date_fin', '>=', periode.date_debut),
+            ], limit=1):
+                raise models.ValidationError(
+                    _('La période %s chevauche une autre période de déductions.') % periode.name
+                )
+
+    def action_generer(self):
+        """(Re)générer les lignes de déduction de la période
+
+        Les affectations remises pendant la période sont agrégées par employé
+        et par équipement déductible en une seule requête groupée. Les lignes
+        existantes sont remplacées : relancer la génération donne le même
+        résultat tant que la période n'est pas clôturée.
+        """
+        for periode in self:
+            if periode.state == 'cloture':
+                raise UserError(_('La période %s est clôturée et ne peut plus être recalculée.') % periode.name)
+
+            groups = self.env['ange.employee.equipement']._read_group(
+                [
+                    ('date_remise', '>=', periode.date_debut),
+                    ('date_remise', '<=', periode.date_fin),
+                    ('employee_id.company_id', '=', periode.company_id.id),
+                    ('equipement_id.deductible', '=', True),
+                ],
+                ['employee_id', 'equipement_id'],
+                ['__count'],
+            )
+
+            periode.ligne_ids.unlink()
+            self.env['ange.deduction.ligne'].create([
+                {
+                    'periode_id': periode.id,
+                    'employee_id': employee.id,
+                    'matricule_agent': employee.matricule_agent,
+                    'equipement_id': equipement.id,
+                    'quantite': count,
+                    'montant_unitaire': equipement.montant_deductible,
+                }
+                for employee, equipement, count in groups
+            ])
+        return True
+
+    def action_cloturer(self):
+        """Clôturer la période : les lignes sont figées"""
+        self.write({'state': 'cloture'})
+        return True
+
+    def action_remettre_brouillon(self):
+        """Rouvrir une période clôturée"""
+        self.write({'state': 'brouillon'})
+        return True
+
+    def write(self, vals):
+        """Réserver la clôture aux responsables RH et figer les périodes clôturées"""
+        if 'state' in vals and not self.env.user.has_group('hr.group_hr_manager'):
+            raise AccessError(_('Seul un responsable RH peut clôturer ou rouvrir une période de déductions.'))
+        if vals.keys() - {'state'} and any(periode.state == 'cloture' for periode in self):
+            raise UserError(_('Une période clôturée ne peut plus être modifiée.'))
+        return super().write(vals)
+
+    def action_view_lignes(self):
+        """Action pour voir les lignes de déduction de la période"""
+        return {
+            'type': 'ir.actions.act_window',
+            'name': f'Déductions - {self.name}',
+            'res_model': 'ange.deduction.ligne',
+            'view_mode': 'list,pivot',
+            'domain': [('periode_id', '=', self.id)],
+            'context': {'search_default_group_employee': 1},
+        }
+
+    def unlink(self):
+        """Interdire la suppression d'une période clôturée"""
+        if any(periode.state == 'cloture' for periode in self):
+            raise UserError(_('Impossible de supprimer une période clôturée.'))
+        return super().unlink()
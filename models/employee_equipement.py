@@ -1,21 +1,38 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+import logging
+from collections import defaultdict
+
+from markupsafe import Markup
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
+from .ange_settings import get_ange_settings
+from .date_utils import days_until_domain
+from .transaction_utils import commit_cron_batch
+
+_logger = logging.getLogger(__name__)
+
+# Champs dont la modification impacte la prévision de renouvellement
+FORECAST_FIELDS = {'equipement_id', 'date_remise', 'statut'}
+
 class EmployeeEquipement(models.Model):
     """Modèle intermédiaire pour gérer l'assignation des équipements aux employés"""
     _name = 'ange.employee.equipement'
     _description = 'Équipement Employé'
     _order = 'date_remise desc'
-    _rec_name = 'display_name'
+    _rec_names_search = ['equipement_id.name', 'employee_id.name']
 
     employee_id = fields.Many2one(
         'hr.employee',
         string='Employé',
         required=True,
         ondelete='cascade',
+        index=True,
         help='Employé concerné'
     )
     
@@ -38,6 +55,7 @@ class EmployeeEquipement(models.Model):
         string='Date de renouvellement',
         compute='_compute_date_renouvellement',
         store=True,
+        index=True,
         help='Date calculée pour le renouvellement de l\'équipement'
     )
     
@@ -54,17 +72,34 @@ class EmployeeEquipement(models.Model):
     )
     
     # Champs calculés pour l'affichage
-    display_name = fields.Char(
-        string='Nom d\'affichage',
-        compute='_compute_display_name',
-        store=True
-    )
-    
     jours_avant_expiration = fields.Integer(
         string='Jours avant expiration',
-        compute='_compute_jours_avant_expiration'
+        compute='_compute_jours_avant_expiration',
+        search='_search_jours_avant_expiration'
     )
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Programmer le rafraîchissement de la prévision des équipements concernés"""
+        records = super().create(vals_list)
+        self.env['ange.equipement.forecast']._mark_to_refresh(records.equipement_id.ids)
+        return records
+
+    def write(self, vals):
+        """Programmer le rafraîchissement de la prévision si le renouvellement change"""
+        if not FORECAST_FIELDS.isdisjoint(vals):
+            equipement_ids = set(self.equipement_id.ids)
+            result = super().write(vals)
+            equipement_ids.update(self.equipement_id.ids)
+            self.env['ange.equipement.forecast']._mark_to_refresh(equipement_ids)
+            return result
+        return super().write(vals)
+
+    def unlink(self):
+        """Programmer le rafraîchissement de la prévision des équipements concernés"""
+        self.env['ange.equipement.forecast']._mark_to_refresh(self.equipement_id.ids)
+        return super().unlink()
+
     @api.depends('equipement_id', 'date_remise', 'equipement_id.periode_renouvellement')
     def _compute_date_renouvellement(self):
         """Calculer la date de renouvellement basée sur la période de renouvellement"""
@@ -76,9 +111,9 @@ class EmployeeEquipement(models.Model):
             else:
                 record.date_renouvellement = False
     
-    @api.depends('employee_id.name', 'equipement_id.name', 'date_remise')
+    @api.depends('employee_id.name', 'equipement_id.name')
     def _compute_display_name(self):
-        """Calculer le nom d'affichage"""
+        """Calculer le nom d'affichage à la volée (noms lus par prefetch)"""
         for record in self:
             if record.employee_id and record.equipement_id:
                 record.display_name = f"{record.equipement_id.name} - {record.employee_id.name}"
@@ -96,60 +131,150 @@ class EmployeeEquipement(models.Model):
             else:
                 record.jours_avant_expiration = 0
     
-    @api.model_create_multi
-    def create(self, vals_list):
-        """Surcharger create pour calculer automatiquement la date de renouvellement"""
-        records = super().create(vals_list)
-        for record in records:
-            record._compute_date_renouvellement()
-        return records
-    
-    def write(self, vals):
-        """Surcharger write pour recalculer la date de renouvellement si nécessaire"""
-        result = super().write(vals)
-        if 'date_remise' in vals or 'equipement_id' in vals:
-            self._compute_date_renouvellement()
-        return result
-    
     @api.model
-    def _cron_check_expiring_equipements(self):
-        """Cron job pour vérifier les équipements qui arrivent à expiration"""
-        # Chercher les équipements qui expirent dans les 30 prochains jours
-        date_limite = fields.Date.today() + relativedelta(days=30)
-        expiring_equipements = self.search([
-            ('date_renouvellement', '<=', date_limite),
-            ('date_renouvellement', '>=', fields.Date.today()),
-            ('statut', '=', 'actif')
+    def _cron_check_expiring_equipements(self, batch_size=None):
+        """Cron job pour expirer les équipements échus et notifier les prochaines échéances
+
+        1. Toutes les affectations actives dont la date de renouvellement est
+           atteinte passent au statut 'expire', par lots (une écriture groupée
+           et un commit par lot).
+        2. Les affectations expirant dans les N prochains jours (paramètre
+           jours_alerte_equipement) sont regroupées par département (à défaut
+           par responsable) : un seul message récapitulatif par destinataire.
+
+        :return: dictionnaire {'expires': nombre de lignes expirées, 'digests': nombre de messages}
+        """
+        settings = get_ange_settings(self.env)
+        batch_size = batch_size or settings['taille_lot_cron']
+        today = fields.Date.today()
+
+        expired_ids = self.search([
+            ('statut', '=', 'actif'),
+            ('date_renouvellement', '<=', today),
+        ]).ids
+        for batch_ids in split_every(batch_size, expired_ids):
+            self.browse(batch_ids).write({'statut': 'expire'})
+            commit_cron_batch(self.env)
+
+        nb_digests = self._send_expiration_digests(
+            today, today + relativedelta(days=settings['jours_alerte_equipement'])
+        )
+        _logger.info(
+            "Équipements : %s affectation(s) expirée(s), %s récapitulatif(s) envoyé(s)",
+            len(expired_ids), nb_digests
+        )
+        return {'expires': len(expired_ids), 'digests': nb_digests}
+
+    @api.model
+    def _send_expiration_digests(self, date_from, date_to):
+        """Envoyer un récapitulatif des équipements expirant entre date_from (exclue) et date_to
+
+        :return: nombre de messages envoyés
+        """
+        expiring = self.search([
+            ('statut', '=', 'actif'),
+            ('date_renouvellement', '>', date_from),
+            ('date_renouvellement', '<=', date_to),
+        ], order='date_renouvellement, id')
+
+        # Regrouper par département, à défaut par responsable de l'employé
+        ids_par_cible = defaultdict(list)
+        for assignment in expiring:
+            employee = assignment.employee_id
+            cible = employee.department_id or employee.parent_id
+            if cible:
+                ids_par_cible[cible].append(assignment.id)
+            else:
+                _logger.info("Équipement %s expirant sans département ni responsable", assignment.display_name)
+
+        for cible, assignment_ids in ids_par_cible.items():
+            responsable = cible.manager_id if cible._name == 'hr.department' else cible
+            partner = responsable.user_id.partner_id
+            cible.message_post(
+                body=self.browse(assignment_ids)._get_expiration_digest_body(date_to),
+                subject=_('Équipements à renouveler avant le %s') % date_to,
+                partner_ids=partner.ids,
+                subtype_xmlid='mail.mt_note',
+            )
+        return len(ids_par_cible)
+
+    def _get_expiration_digest_body(self, date_to):
+        """Corps HTML du récapitulatif des équipements expirant"""
+        rows = Markup().join(
+            Markup('<tr><td>%s</td><td>%s</td><td>%s</td></tr>') % (
+                record.employee_id.name,
+                record.equipement_id.name,
+                record.date_renouvellement,
+            )
+            for record in self
+        )
+        return Markup(
+            '<p>%s</p>'
+            '<table class="table table-sm">'
+            '<thead><tr><th>%s</th><th>%s</th><th>%s</th></tr></thead>'
+            '<tbody>%s</tbody></table>'
+        ) % (
+            _('%s équipement(s) à renouveler avant le %s :') % (len(self), date_to),
+            _('Employé'), _('Équipement'), _('Date de renouvellement'),
+            rows,
+        )
+
+    def _search_jours_avant_expiration(self, operator, value):
+        """Recherche pour le champ jours_avant_expiration (plage sur date_renouvellement)"""
+        return days_until_domain('date_renouvellement', operator, value, fields.Date.today())
+
+    def _order_field_to_sql(self, alias, field_name, direction, nulls, query):
+        # Trier sur les jours avant expiration revient à trier sur la date indexée
+        if field_name == 'jours_avant_expiration':
+            field_name = 'date_renouvellement'
+        return super()._order_field_to_sql(alias, field_name, direction, nulls, query)
+
+    def _renouveler(self, date_remise=None):
+        """Renouveler les affectations actives ou expirées de l'ensemble
+
+        Les anciennes affectations passent au statut 'renouvele' en une seule
+        écriture et leurs remplaçantes sont créées en un seul lot. Utilisable
+        depuis l'interface comme depuis une tâche planifiée.
+
+        :return: les nouvelles affectations créées
+        """
+        records = self.filtered(lambda r: r.statut in ('actif', 'expire'))
+        if not records:
+            return self.browse()
+
+        date_remise = date_remise or fields.Date.today()
+        records.write({'statut': 'renouvele'})
+        return self.create([
+            {
+                'employee_id': record.employee_id.id,
+                'equipement_id': record.equipement_id.id,
+                'date_remise': date_remise,
+                'notes': f"Renouvellement de l'équipement du {record.date_remise}",
+            }
+            for record in records
         ])
-        
-        # Ici on pourrait ajouter une notification ou un email
-        # Pour l'instant, on met juste à jour le statut
-        for equipement in expiring_equipements:
-            if equipement.date_renouvellement <= fields.Date.today():
-                equipement.statut = 'expire'
-    
+
     def action_renouveler(self):
-        """Action pour renouveler un équipement"""
-        self.ensure_one()
-        # Marquer l'ancien comme renouvelé
-        self.statut = 'renouvele'
-        
-        # Créer un nouvel enregistrement avec une nouvelle date de remise
-        new_vals = {
-            'employee_id': self.employee_id.id,
-            'equipement_id': self.equipement_id.id,
-            'date_remise': fields.Date.today(),
-            'notes': f"Renouvellement de l'équipement du {self.date_remise}"
-        }
-        
-        new_record = self.create(new_vals)
-        
+        """Action pour renouveler un ou plusieurs équipements"""
+        new_records = self._renouveler()
+        if not new_records:
+            raise UserError(_('Seuls les équipements actifs ou expirés peuvent être renouvelés.'))
+
+        if len(new_records) == 1:
+            return {
+                'type': 'ir.actions.act_window',
+                'name': 'Équipement Renouvelé',
+                'res_model': 'ange.employee.equipement',
+                'res_id': new_records.id,
+                'view_mode': 'form',
+                'target': 'current'
+            }
         return {
             'type': 'ir.actions.act_window',
-            'name': 'Équipement Renouvelé',
+            'name': 'Équipements Renouvelés',
             'res_model': 'ange.employee.equipement',
-            'res_id': new_record.id,
-            'view_mode': 'form',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', new_records.ids)],
             'target': 'current'
         }
     
@@ -46,19 +46,35 @@ class Equipement(models.Model):
         string='Assignations aux employés'
     )
     
-    # Champ calculé pour le nombre d'employés ayant cet équipement
+    # Champ calculé pour le nombre d'employés détenant actuellement cet équipement
     nb_employees = fields.Integer(
         string='Nombre d\'employés',
         compute='_compute_nb_employees',
-        store=True
+        store=True,
+        help='Nombre d\'employés distincts ayant une affectation active de cet équipement'
     )
     
-    @api.depends('employee_equipement_ids')
+    @api.depends('employee_equipement_ids.statut', 'employee_equipement_ids.employee_id')
     def _compute_nb_employees(self):
-        """Calculer le nombre d'employés ayant cet équipement"""
+        """Calculer le nombre de détenteurs actifs en une requête groupée"""
+        counts = {}
+        equipements = self.filtered('id')
+        if equipements:
+            counts = dict(self.env['ange.employee.equipement']._read_group(
+                [('equipement_id', 'in', equipements.ids), ('statut', '=', 'actif')],
+                ['equipement_id'],
+                ['employee_id:count_distinct'],
+            ))
         for equipement in self:
-            equipement.nb_employees = len(equipement.employee_equipement_ids)
+            equipement.nb_employees = counts.get(equipement, 0)
     
+    def write(self, vals):
+        """Programmer le rafraîchissement de la prévision si la période ou le montant change"""
+        result = super().write(vals)
+        if {'periode_renouvellement', 'deductible', 'montant_deductible'} & vals.keys():
+            self.env['ange.equipement.forecast']._mark_to_refresh(self.ids)
+        return result
+
     @api.onchange('deductible')
     def _onchange_deductible(self):
         """Réinitialiser le montant déductible si pas déductible"""
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from dateutil.relativedelta import relativedelta
+
+from .transaction_utils import mark_precommit_pending
+
+# Nombre de mois couverts par la prévision, mois en cours compris
+HORIZON_MOIS = 12
+
+# Clé des équipements à rafraîchir dans cr.precommit.data
+PENDING_KEY = 'ange.equipement.forecast.pending'
+
+
+class EquipementForecast(models.Model):
+    """Prévision des renouvellements d'équipements par mois (table précalculée)"""
+    _name = 'ange.equipement.forecast'
+    _description = 'Prévision de Renouvellement des Équipements'
+    _order = 'mois, equipement_id'
+    _rec_name = 'equipement_id'
+
+    equipement_id = fields.Many2one(
+        'ange.equipement',
+        string='Équipement',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    mois = fields.Date(
+        string='Mois',
+        required=True,
+        readonly=True,
+        help='Premier jour du mois de renouvellement prévu'
+    )
+
+    nb_renouvellements = fields.Integer(
+        string='Renouvellements',
+        readonly=True,
+        help='Nombre d\'affectations à renouveler sur le mois'
+    )
+
+    montant_deductible = fields.Float(
+        string='Montant déductible',
+        readonly=True,
+        help='Montant déductible total des renouvellements du mois'
+    )
+
+    @api.model
+    def _mark_to_refresh(self, equipement_ids):
+        """Programmer le rafraîchissement des équipements donnés avant le commit"""
+        mark_precommit_pending(self.env, PENDING_KEY, equipement_ids, self._refresh_pending)
+
+    @api.model
+    def _refresh_pending(self, equipement_ids):
+        """Rafraîchir en une fois les équipements marqués pendant la transaction"""
+        self.sudo()._refresh_forecast(list(equipement_ids))
+
+    @api.model
+    def _refresh_forecast(self, equipement_ids=None):
+        """Recalculer la prévision (de tous les équipements ou seulement de ceux donnés)
+
+        Les affectations actives ou expirées sont agrégées par équipement et par
+        mois de renouvellement en une seule requête ; les renouvellements déjà
+        échus sont comptés dans le mois en cours.
+        """
+        self.env['ange.employee.equipement'].flush_model(['equipement_id', 'statut', 'date_renouvellement'])
+        self.env['ange.equipement'].flush_model(['deductible', 'montant_deductible'])
+
+        debut = fields.Date.today().replace(day=1)
+        fin = debut + relativedelta(months=HORIZON_MOIS)
+        params = {'debut': debut, 'fin': fin, 'uid': self.env.uid}
+        filtre = ""
+        if equipement_ids is not None:
+            if not equipement_ids:
+                return
+            filtre = "AND ee.equipement_id IN %(equipement_ids)s"
+            params['equipement_ids'] = tuple(equipement_ids)
+            self.env.cr.execute(
+                "DELETE FROM ange_equipement_forecast WHERE equipement_id IN %(equipement_ids)s", params
+            )
+        else:
+            self.env.cr.execute("DELETE FROM ange_equipement_forecast")
+
+        self.env.cr.execute("""
+            INSERT INTO ange_equipement_forecast
+                   (equipement_id, mois, nb_renouvellements, montant_deductible,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT ee.equipement_id,
+                   GREATEST(date_trunc('month', ee.date_renouvellement)::date, %%(debut)s) AS mois,
+                   COUNT(*),
+                   SUM(CASE WHEN e.deductible THEN e.montant_deductible ELSE 0 END),
+                   %%(uid)s, NOW() AT TIME ZONE 'UTC', %%(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM ange_employee_equipement ee
+              JOIN ange_equipement e ON e.id = ee.equipement_id
+             WHERE ee.statut IN ('actif', 'expire')
+               AND ee.date_renouvellement < %%(fin)s
+               %s
+          GROUP BY ee.equipement_id, 2
+        """ % filtre, params)
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh_forecast(self):
+        """Cron job : recalcul complet (glissement de l'horizon au changement de mois)"""
+        self._refresh_forecast()
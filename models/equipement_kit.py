@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, _
+
+
+class EquipementKit(models.Model):
+    """Modèle pour gérer les kits d'équipements (dotations groupées)"""
+    _name = 'ange.equipement.kit'
+    _description = 'Kit d\'Équipements'
+    _order = 'name'
+
+    name = fields.Char(
+        string='Nom du kit',
+        required=True,
+        help='Nom du kit (ex : Dotation été 2025)'
+    )
+
+    description = fields.Text(
+        string='Description',
+        help='Description détaillée du kit'
+    )
+
+    equipement_ids = fields.Many2many(
+        'ange.equipement',
+        'ange_equipement_kit_rel',
+        'kit_id',
+        'equipement_id',
+        string='Équipements',
+        help='Équipements remis ensemble lors d\'une dotation'
+    )
+
+    active = fields.Boolean(
+        string='Actif',
+        default=True,
+        help='Indique si ce kit est actif'
+    )
+
+    def _issue_to_employees(self, employees, date_remise=None):
+        """Remettre le kit à tous les employés donnés en un seul lot
+
+        Les affectations en cours (actives ou expirées) des mêmes équipements
+        passent au statut 'renouvele' en une écriture, puis toutes les
+        nouvelles affectations sont créées en un seul create.
+
+        :return: les enregistrements ange.employee.equipement créés
+        """
+        self.ensure_one()
+        date_remise = date_remise or fields.Date.today()
+        Assignment = self.env['ange.employee.equipement']
+
+        Assignment.search([
+            ('employee_id', 'in', employees.ids),
+            ('equipement_id', 'in', self.equipement_ids.ids),
+            ('statut', 'in', ('actif', 'expire')),
+        ]).write({'statut': 'renouvele'})
+
+        note = _('Dotation du kit %s') % self.name
+        return Assignment.create([
+            {
+                'employee_id': employee.id,
+                'equipement_id': equipement.id,
+                'date_remise': date_remise,
+                'notes': note,
+            }
+            for employee in employees
+            for equipement in self.equipement_ids
+        ])
+
+    def action_issue(self):
+        """Action pour distribuer ce kit à des employés"""
+        return {
+            'type': 'ir.actions.act_window',
+            'name': f'Distribuer le kit {self.name}',
+            'res_model': 'ange.equipement.kit.issue.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_kit_id': self.id,
+            }
+        }
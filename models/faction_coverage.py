@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+from .transaction_utils import mark_precommit_pending
+
+# Résolution de la couverture : créneaux de 15 minutes
+CRENEAUX_PAR_HEURE = 4
+CRENEAUX_PAR_JOUR = 24 * CRENEAUX_PAR_HEURE
+
+JOURS = [
+    ('0', 'Lundi'),
+    ('1', 'Mardi'),
+    ('2', 'Mercredi'),
+    ('3', 'Jeudi'),
+    ('4', 'Vendredi'),
+    ('5', 'Samedi'),
+    ('6', 'Dimanche'),
+]
+
+# Clé des factions à recalculer dans cr.precommit.data
+PENDING_KEY = 'ange.faction.coverage.pending'
+
+
+class FactionCoverage(models.Model):
+    """Couverture horaire des factions sur la semaine (table précalculée)"""
+    _name = 'ange.faction.coverage'
+    _description = 'Couverture Horaire des Factions'
+    _order = 'faction_id, jour, heure'
+    _rec_name = 'faction_id'
+
+    faction_id = fields.Many2one(
+        'hr.faction',
+        string='Faction',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    type_faction = fields.Selection(
+        [('jour', 'Jour'), ('nuit', 'Nuit'), ('custom', 'Personnalisée')],
+        string='Type de faction',
+        readonly=True
+    )
+
+    jour = fields.Selection(
+        JOURS,
+        string='Jour',
+        required=True,
+        readonly=True
+    )
+
+    heure = fields.Integer(
+        string='Heure',
+        required=True,
+        readonly=True,
+        help='Heure de la journée (0 à 23)'
+    )
+
+    nb_agents = fields.Float(
+        string='Agents en poste',
+        readonly=True,
+        digits=(16, 2),
+        help='Nombre moyen d\'agents en poste sur l\'heure (par créneaux de 15 minutes)'
+    )
+
+    @api.model
+    def _mark_to_rebuild(self, faction_ids):
+        """Programmer le recalcul de la couverture des factions données avant le commit"""
+        mark_precommit_pending(self.env, PENDING_KEY, faction_ids, self._rebuild_pending)
+
+    @api.model
+    def _rebuild_pending(self, faction_ids):
+        """Recalculer en une fois les factions marquées pendant la transaction"""
+        self.sudo()._rebuild_coverage(list(faction_ids))
+
+    @api.model
+    def _get_occupation_creneaux(self, heure_debut, heure_fin):
+        """Masque d'occupation d'une journée type, par créneau de 15 minutes
+
+        Une faction de nuit déborde sur le lendemain : comme chaque jour répète
+        la même faction, sa fin est reportée sur le début de la journée type.
+
+        :return: liste de CRENEAUX_PAR_JOUR entiers (0 ou 1)
+        """
+        debut = round(heure_debut * CRENEAUX_PAR_HEURE)
+        fin = round(heure_fin * CRENEAUX_PAR_HEURE)
+        if fin <= debut:
+            fin += CRENEAUX_PAR_JOUR
+        masque = [0] * CRENEAUX_PAR_JOUR
+        for creneau in range(debut, fin):
+            masque[creneau % CRENEAUX_PAR_JOUR] = 1
+        return masque
+
+    @api.model
+    def _rebuild_coverage(self, faction_ids=None):
+        """Recalculer la couverture (de toutes les factions ou seulement de celles données)
+
+        Pour chaque faction active, le masque de créneaux est calculé une fois
+        puis multiplié par le nombre d'employés assignés ; toutes les lignes
+        (7 jours × 24 heures) sont créées en un seul appel.
+        """
+        Faction = self.env['hr.faction'].with_context(active_test=False)
+        if faction_ids is None:
+            factions = Faction.search([])
+            self.search([]).unlink()
+        else:
+            factions = Faction.browse(faction_ids).exists()
+            self.search([('faction_id', 'in', list(faction_ids))]).unlink()
+
+        vals_list = []
+        for faction in factions.filtered('active'):
+            masque = self._get_occupation_creneaux(faction.heure_debut, faction.heure_fin)
+            heures = [
+                sum(masque[heure * CRENEAUX_PAR_HEURE:(heure + 1) * CRENEAUX_PAR_HEURE])
+                * faction.nb_employees / CRENEAUX_PAR_HEURE
+                for heure in range(24)
+            ]
+            vals_list.extend(
+                {
+                    'faction_id': faction.id,
+                    'type_faction': faction.type_faction,
+                    'jour': jour,
+                    'heure': heure,
+                    'nb_agents': nb_agents,
+                }
+                for jour, __ in JOURS
+                for heure, nb_agents in enumerate(heures)
+            )
+        self.create(vals_list)
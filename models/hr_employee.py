@@ -1,12 +1,33 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+from odoo.tools import SQL, escape_psql, split_every
+
+from .ange_settings import get_ange_settings
+from .stats_utils import count_by_statut
+from .transaction_utils import commit_cron_batch
+
+_logger = logging.getLogger(__name__)
 
 
 class HrEmployee(models.Model):
     """Extension du modèle hr.employee pour Ange Security"""
     _inherit = 'hr.employee'
 
+    # Contrainte UNIQUE : les matricules vides (NULL) ne sont jamais en conflit
+    _sql_constraints = [
+        ('matricule_agent_company_uniq', 'unique(matricule_agent, company_id)',
+         'Ce matricule agent est déjà utilisé par un autre employé de la société.'),
+    ]
+
     # ========================================
     # CHAMPS POUR L'ONGLET ÉQUIPEMENT ET SANTÉ
     # ========================================
@@ -72,13 +93,22 @@ class HrEmployee(models.Model):
     # Nouveaux champs de dates de validité
     date_validite_cni = fields.Date(
         string='Date de validité CNI',
+        index=True,
         help='Date d\'expiration de la Carte Nationale d\'Identité'
     )
     
     date_validite_carte_sejour = fields.Date(
         string='Date de validité carte de séjour',
+        index=True,
         help='Date d\'expiration de la carte de séjour'
     )
+
+    document_expirant = fields.Boolean(
+        string='Document expirant',
+        compute='_compute_document_expirant',
+        search='_search_document_expirant',
+        help='CNI ou carte de séjour expirée ou expirant dans la fenêtre d\'alerte des documents'
+    )
     
     # Matricule agent
     matricule_agent = fields.Char(
@@ -98,6 +128,7 @@ class HrEmployee(models.Model):
     faction_id = fields.Many2one(
         'hr.faction',
         string='Faction',
+        index=True,
         help='Faction par défaut du collaborateur'
     )
 
@@ -114,28 +145,178 @@ class HrEmployee(models.Model):
     
     @api.depends('formation_ids.statut')
     def _compute_formation_stats(self):
-        """Calculer les statistiques de formation de l'employé"""
+        """Calculer les statistiques de formation en une requête groupée"""
+        counts = count_by_statut(self, 'ange.employee.formation', 'employee_id')
         for employee in self:
-            formations = employee.formation_ids
-            employee.nb_formations_total = len(formations)
-            employee.nb_formations_terminees = len(formations.filtered(lambda f: f.statut == 'terminee'))
-            employee.nb_formations_en_cours = len(formations.filtered(lambda f: f.statut == 'en_cours'))
-            employee.nb_formations_recyclage = len(formations.filtered(lambda f: f.statut == 'recyclage_requis'))
+            employee.nb_formations_total = counts[employee.id, None]
+            employee.nb_formations_terminees = counts[employee.id, 'terminee']
+            employee.nb_formations_en_cours = counts[employee.id, 'en_cours']
+            employee.nb_formations_recyclage = counts[employee.id, 'recyclage_requis']
+
             
     
-    @api.constrains('matricule_agent')
-    def _check_matricule_agent_unique(self):
-        """Vérifier l'unicité du matricule agent"""
-        for record in self:
-            if record.matricule_agent:
-                existing = self.search([
-                    ('matricule_agent', '=', record.matricule_agent),
-                    ('id', '!=', record.id)
+    @api.model
+    def _get_date_limite_documents(self):
+        """Date limite de la fenêtre d'alerte des documents d'identité"""
+        return fields.Date.today() + timedelta(days=get_ange_settings(self.env)['jours_alerte_documents'])
+
+    @api.depends('date_validite_cni', 'date_validite_carte_sejour')
+    def _compute_document_expirant(self):
+        """Calculer si un document d'identité expire dans la fenêtre d'alerte"""
+        limite = self._get_date_limite_documents()
+        for employee in self:
+            employee.document_expirant = any(
+                date_validite and date_validite <= limite
+                for date_validite in (employee.date_validite_cni, employee.date_validite_carte_sejour)
+            )
+
+    def _search_document_expirant(self, operator, value):
+        """Recherche pour le champ document_expirant (parcours d'intervalle sur les dates indexées)"""
+        if operator not in ('=', '!='):
+            raise UserError(_('Opérateur non supporté pour ce champ : %s') % operator)
+        limite = self._get_date_limite_documents()
+        if (operator == '=') == bool(value):
+            return [
+                '|',
+                ('date_validite_cni', '<=', limite),
+                ('date_validite_carte_sejour', '<=', limite),
+            ]
+        return [
+            '|', ('date_validite_cni', '=', False), ('date_validite_cni', '>', limite),
+            '|', ('date_validite_carte_sejour', '=', False), ('date_validite_carte_sejour', '>', limite),
+        ]
+
+    @api.model
+    def _cron_check_expiring_documents(self, batch_size=None):
+        """Cron job pour planifier le renouvellement des documents d'identité expirants
+
+        Les employés dont la CNI ou la carte de séjour expire dans les N prochains
+        jours (paramètre jours_alerte_documents) et qui n'ont pas encore d'activité
+        de renouvellement reçoivent une activité assignée au responsable RH
+        (voir _get_document_activity_users). Les activités sont créées par lots,
+        regroupées par responsable.
+
+        :return: nombre d'activités créées
+        """
+        activity_type = self.env.ref(
+            'ange_sec_employee.mail_activity_type_document_expirant', raise_if_not_found=False
+        )
+        if not activity_type:
+            return 0
+        batch_size = batch_size or get_ange_settings(self.env)['taille_lot_cron']
+        limite = self._get_date_limite_documents()
+
+        employees = self.search_fetch(expression.AND([
+            self._search_document_expirant('=', True),
+            [('activity_ids', 'not any', [('activity_type_id', '=', activity_type.id)])],
+        ]), ['company_id', 'date_validite_cni', 'date_validite_carte_sejour'])
+
+        users_by_company = employees._get_document_activity_users()
+        employees_by_user = defaultdict(list)
+        for employee in employees:
+            employees_by_user[users_by_company[employee.company_id]].append(employee)
+
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        Activity = self.env['mail.activity'].with_context(mail_activity_quick_update=True)
+        for user, user_employees in employees_by_user.items():
+            for batch in split_every(batch_size, user_employees):
+                Activity.create([
+                    employee._get_document_activity_values(activity_type, user, res_model_id, limite)
+                    for employee in batch
                 ])
-                if existing:
-                    raise models.ValidationError(_(
-                        'Le matricule agent "%s" est déjà utilisé par un autre employé.'
-                    ) % record.matricule_agent)
+            _logger.info(
+                "Documents d'identité : %s activité(s) de renouvellement pour %s",
+                len(user_employees), user.name
+            )
+        return len(employees)
+
+    def _get_document_activity_users(self):
+        """Responsable RH des activités de renouvellement, pour chaque société des employés
+
+        Utilisateur configuré dans les paramètres du module s'il est actif, sinon
+        premier administrateur RH (hr.group_hr_manager) de la société, sinon
+        premier agent RH (hr.group_hr_user), sinon l'administrateur.
+
+        :return: dictionnaire {société: utilisateur}
+        """
+        Users = self.env['res.users'].sudo()
+        responsable = Users.browse(get_ange_settings(self.env)['responsable_documents_id']).exists()
+        if responsable.active:
+            return {company: responsable for company in self.company_id}
+
+        admin = self.env.ref('base.user_admin')
+        groups = [self.env.ref(xmlid) for xmlid in ('hr.group_hr_manager', 'hr.group_hr_user')]
+        users_by_company = {}
+        for company in self.company_id:
+            user = Users
+            for group in groups:
+                user = Users.search([
+                    ('groups_id', 'in', group.id),
+                    ('share', '=', False),
+                    ('company_ids', 'in', company.id),
+                ], order='id', limit=1)
+                if user:
+                    break
+            users_by_company[company] = user or admin
+        return users_by_company
+
+    def _get_document_activity_values(self, activity_type, user, res_model_id, limite):
+        """Valeurs de l'activité de renouvellement des documents de l'employé"""
+        self.ensure_one()
+        documents = [
+            (label, date_validite)
+            for label, date_validite in (
+                (_('CNI'), self.date_validite_cni),
+                (_('Carte de séjour'), self.date_validite_carte_sejour),
+            )
+            if date_validite and date_validite <= limite
+        ]
+        return {
+            'res_model_id': res_model_id,
+            'res_id': self.id,
+            'activity_type_id': activity_type.id,
+            'user_id': user.id,
+            'date_deadline': min(date_validite for __, date_validite in documents),
+            'summary': ', '.join(
+                _('%(document)s expire le %(date)s', document=label, date=fields.Date.to_string(date_validite))
+                for label, date_validite in documents
+            ),
+        }
+
+    def _auto_init(self):
+        res = super()._auto_init()
+        # Index pour la recherche de matricule sans casse, exacte ou par préfixe (LIKE 'XXX%')
+        tools.drop_index(self._cr, 'hr_employee_matricule_agent_prefix_index', self._table)
+        tools.create_index(
+            self._cr, 'hr_employee_matricule_agent_upper_prefix_index', self._table,
+            ['upper(matricule_agent) text_pattern_ops'], where='matricule_agent IS NOT NULL'
+        )
+        return res
+
+    @api.model
+    def _search_display_name(self, operator, value):
+        """Rechercher aussi par matricule agent exact ou par préfixe de matricule, sans casse
+
+        La condition porte sur upper(matricule_agent) pour utiliser l'index
+        hr_employee_matricule_agent_upper_prefix_index.
+        """
+        domain = super()._search_display_name(operator, value)
+        matricule = value.strip() if isinstance(value, str) else False
+        if not matricule:
+            return domain
+        if operator == '=':
+            pattern = escape_psql(matricule.upper())
+        elif operator in ('ilike', 'like', '=ilike', '=like'):
+            pattern = escape_psql(matricule.upper()) + '%'
+        else:
+            return domain
+        query = self._search([('matricule_agent', '!=', False)])
+        query.add_where(SQL(
+            "upper(%s) LIKE %s",
+            self._field_to_sql(query.table, 'matricule_agent', query),
+            pattern,
+        ))
+        return expression.OR([domain, [('id', 'in', query)]])
     
     # Relation avec les équipements via le modèle intermédiaire
     equipement_ids = fields.One2many(
@@ -157,13 +338,189 @@ class HrEmployee(models.Model):
         store=True
     )
     
+    # Déployabilité : recalculée par les écritures sur les formations, équipements,
+    # visites et dates de validité, et chaque jour pour les échéances atteintes
+    deployable = fields.Boolean(
+        string='Déployable',
+        compute='_compute_deployable',
+        store=True,
+        index=True,
+        help='Agent en règle : formations, équipements, visite médicale et documents d\'identité valides'
+    )
+
+    motifs_blocage = fields.Text(
+        string='Motifs de blocage',
+        compute='_compute_deployable',
+        store=True,
+        help='Exigences non satisfaites empêchant le déploiement de l\'agent'
+    )
+
+    date_limite_deploiement = fields.Date(
+        string='Déployable jusqu\'au',
+        compute='_compute_deployable',
+        store=True,
+        index=True,
+        help='Première échéance (recyclage, renouvellement, visite, document) à laquelle l\'agent cessera d\'être déployable'
+    )
+
     @api.depends('equipement_ids.statut')
     def _compute_equipements_stats(self):
-        """Calculer les statistiques des équipements"""
+        """Calculer les statistiques des équipements en une requête groupée"""
+        counts = count_by_statut(self, 'ange.employee.equipement', 'employee_id')
         for employee in self:
-            equipements = employee.equipement_ids
-            employee.nb_equipements_actifs = len(equipements.filtered(lambda e: e.statut == 'actif'))
-            employee.nb_equipements_expires = len(equipements.filtered(lambda e: e.statut == 'expire'))
+            employee.nb_equipements_actifs = counts[employee.id, 'actif']
+            employee.nb_equipements_expires = counts[employee.id, 'expire']
+
+    @api.depends(
+        'formation_ids.statut', 'formation_ids.date_recyclage',
+        'equipement_ids.statut', 'equipement_ids.date_renouvellement',
+        'visite_medicale_ids.fait', 'visite_medicale_ids.date',
+        'date_validite_cni', 'date_validite_carte_sejour',
+    )
+    def _compute_deployable(self):
+        """Calculer la déployabilité en une requête groupée par exigence"""
+        today = fields.Date.today()
+        mois_validite_visite = get_ange_settings(self.env)['mois_validite_visite']
+        formations = defaultdict(dict)
+        equipements = defaultdict(dict)
+        visites = {}
+        employees = self.filtered('id')
+        if employees:
+            for employee, statut, count, date_min in self.env['ange.employee.formation']._read_group(
+                [('employee_id', 'in', employees.ids), ('statut', 'in', ('terminee', 'recyclage_requis'))],
+                ['employee_id', 'statut'],
+                ['__count', 'date_recyclage:min'],
+            ):
+                formations[employee.id][statut] = (count, date_min)
+            for employee, statut, count, date_min in self.env['ange.employee.equipement']._read_group(
+                [('employee_id', 'in', employees.ids), ('statut', 'in', ('actif', 'expire'))],
+                ['employee_id', 'statut'],
+                ['__count', 'date_renouvellement:min'],
+            ):
+                equipements[employee.id][statut] = (count, date_min)
+            visites = {
+                employee.id: date_max
+                for employee, date_max in self.env['visite.medicale']._read_group(
+                    [('employee_id', 'in', employees.ids), ('fait', '=', True)],
+                    ['employee_id'],
+                    ['date:max'],
+                )
+            }
+
+        for employee in self:
+            motifs = []
+            echeances = []
+
+            formation = formations[employee.id]
+            nb_terminees, date_recyclage = formation.get('terminee', (0, False))
+            if 'recyclage_requis' in formation or (date_recyclage and date_recyclage <= today):
+                motifs.append(_('Formation à recycler'))
+            elif not nb_terminees:
+                motifs.append(_('Aucune formation terminée'))
+            echeances.append(date_recyclage)
+
+            equipement = equipements[employee.id]
+            nb_actifs, date_renouvellement = equipement.get('actif', (0, False))
+            if 'expire' in equipement or (date_renouvellement and date_renouvellement <= today):
+                motifs.append(_('Équipement expiré'))
+            elif not nb_actifs:
+                motifs.append(_('Aucun équipement actif'))
+            echeances.append(date_renouvellement)
+
+            date_visite = visites.get(employee.id)
+            fin_visite = date_visite and date_visite + relativedelta(months=mois_validite_visite)
+            if not fin_visite or fin_visite <= today:
+                motifs.append(_('Visite médicale absente ou périmée'))
+            echeances.append(fin_visite)
+
+            documents = [
+                date_validite
+                for date_validite in (employee.date_validite_cni, employee.date_validite_carte_sejour)
+                if date_validite
+            ]
+            if not documents:
+                motifs.append(_('Aucun document d\'identité renseigné'))
+            elif min(documents) <= today:
+                motifs.append(_('Document d\'identité expiré'))
+            echeances.extend(documents)
+
+            echeances = [echeance for echeance in echeances if echeance]
+            employee.deployable = not motifs
+            employee.motifs_blocage = '\n'.join(motifs) or False
+            employee.date_limite_deploiement = min(echeances) if echeances and not motifs else False
+
+    def _recompute_deployable(self):
+        """Forcer le recalcul de la déployabilité des employés"""
+        fnames = ['deployable', 'motifs_blocage', 'date_limite_deploiement']
+        for fname in fnames:
+            self.env.add_to_compute(self._fields[fname], self)
+        self._recompute_recordset(fnames)
+
+    @api.model
+    def check_deployable(self, employee_ids):
+        """Indiquer pour chaque employé s'il est déployable aujourd'hui (une seule requête)
+
+        Une échéance atteinte depuis le dernier passage du cron rend l'employé
+        non déployable même si l'état stocké n'a pas encore été recalculé.
+
+        :param employee_ids: liste d'identifiants hr.employee
+        :return: dictionnaire {employee_id: {'deployable', 'motifs', 'date_limite'}}
+        """
+        today = fields.Date.today()
+        result = {}
+        for employee in self.search_fetch(
+            [('id', 'in', list(employee_ids))],
+            ['deployable', 'motifs_blocage', 'date_limite_deploiement'],
+        ):
+            deployable = employee.deployable
+            motifs = employee.motifs_blocage.splitlines() if employee.motifs_blocage else []
+            if deployable and employee.date_limite_deploiement and employee.date_limite_deploiement <= today:
+                deployable = False
+                motifs = [_('Échéance de conformité atteinte le %s') % employee.date_limite_deploiement]
+            result[employee.id] = {
+                'deployable': deployable,
+                'motifs': motifs,
+                'date_limite': employee.date_limite_deploiement if deployable else False,
+            }
+        return result
+
+    @api.model
+    def _cron_update_deployable(self, batch_size=None):
+        """Cron job pour recalculer les employés dont une échéance de conformité est atteinte
+
+        :return: nombre d'employés recalculés
+        """
+        batch_size = batch_size or get_ange_settings(self.env)['taille_lot_cron']
+        employee_ids = self.search([
+            ('date_limite_deploiement', '<=', fields.Date.today()),
+        ]).ids
+        for batch_ids in split_every(batch_size, employee_ids):
+            self.browse(batch_ids)._recompute_deployable()
+            commit_cron_batch(self.env)
+        _logger.info("Déployabilité : %s employé(s) recalculé(s)", len(employee_ids))
+        return len(employee_ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Programmer le recalcul de la couverture horaire des factions concernées"""
+        employees = super().create(vals_list)
+        self.env['ange.faction.coverage']._mark_to_rebuild(employees.faction_id.ids)
+        return employees
+
+    def write(self, vals):
+        """Programmer le recalcul de la couverture horaire si la faction change"""
+        if {'faction_id', 'active'} & vals.keys():
+            faction_ids = set(self.faction_id.ids)
+            result = super().write(vals)
+            faction_ids.update(self.faction_id.ids)
+            self.env['ange.faction.coverage']._mark_to_rebuild(faction_ids)
+            return result
+        return super().write(vals)
+
+    def unlink(self):
+        """Programmer le recalcul de la couverture horaire des factions concernées"""
+        self.env['ange.faction.coverage']._mark_to_rebuild(self.faction_id.ids)
+        return super().unlink()
 
     def action_view_formations(self):
         """Action pour voir les formations de cet employé"""
@@ -186,9 +543,3 @@ class HrEmployee(models.Model):
             'domain': [('employee_id', '=', self.id)],
             'context': {'default_employee_id': self.id}
         }
-
-    @api.model
-    def _get_view_cache_key(self, view_id=None, view_type='form', **options):
-        """Override pour s'assurer que les vues sont correctement mises à jour"""
-        key = super()._get_view_cache_key(view_id, view_type, **options)
-        return key + (self._name,)
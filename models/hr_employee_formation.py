@@ -1,17 +1,35 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, api, tools, _
+from odoo.osv import expression
+from odoo.tools import split_every
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
+from .ange_settings import get_ange_settings
+from .date_utils import days_until_domain
+from .transaction_utils import commit_cron_batch
+
+_logger = logging.getLogger(__name__)
+
+# Dernière date traitée par le moteur de transitions de statut
+STATUT_LAST_RUN_PARAM = 'ange_sec_employee.statut_transitions_last_run'
+
 
 class HrEmployeeFormation(models.Model):
     """Modèle intermédiaire pour gérer les statuts de formation par employé"""
     _name = 'ange.employee.formation'
     _description = 'Formation Employé Ange Security - Statut Individuel'
     _order = 'employee_id, formation_id'
-    _rec_name = 'display_name'
-    
+    _rec_names_search = ['formation_id.name', 'employee_id.name']
+
+    _sql_constraints = [
+        ('employee_formation_unique', 'unique(employee_id, formation_id)',
+         'Cet employé a déjà un enregistrement pour cette formation.'),
+    ]
 
     # Relations
     employee_id = fields.Many2one(
@@ -43,11 +61,13 @@ class HrEmployeeFormation(models.Model):
     # Dates spécifiques à cet employé
     date_debut = fields.Date(
         string='Date de début',
+        index=True,
         help='Date de début de la formation pour cet employé'
     )
     
     date_fin = fields.Date(
         string='Date de fin',
+        index=True,
         help='Date de fin de la formation pour cet employé'
     )
     
@@ -55,6 +75,7 @@ class HrEmployeeFormation(models.Model):
         string='Date de recyclage',
         compute='_compute_date_recyclage',
         store=True,
+        index=True,
         help='Date calculée pour le recyclage de cette formation'
     )
     
@@ -69,9 +90,17 @@ class HrEmployeeFormation(models.Model):
     jours_avant_recyclage = fields.Integer(
         string='Jours avant recyclage',
         compute='_compute_jours_avant_recyclage',
+        search='_search_jours_avant_recyclage',
         help='Nombre de jours avant la date de recyclage'
     )
     
+    date_alerte = fields.Date(
+        string='Date d\'alerte',
+        compute='_compute_date_alerte',
+        store=True,
+        help='Date à partir de laquelle une alerte de recyclage est affichée'
+    )
+
     alerte_recyclage = fields.Boolean(
         string='Alerte recyclage',
         compute='_compute_alerte_recyclage',
@@ -80,30 +109,33 @@ class HrEmployeeFormation(models.Model):
     )
 
     
+    # Non stocké : un changement de durée sur la formation est propagé
+    # aux dates de recyclage par _update_date_recyclage_from_formations()
     duree_avant_recyclage = fields.Integer(
         related='formation_id.duree_avant_recyclage',
-        string='Durée avant recyclage (mois)',
-        store=True
+        string='Durée avant recyclage (mois)'
     )
     
-    # Champ name pour l'affichage (related au nom de la formation)
+    # Champ name pour l'affichage (related au nom de la formation, non stocké
+    # pour qu'un renommage de formation ne réécrive pas toutes les affectations)
     name = fields.Char(
         related='formation_id.name',
         string='Nom de la formation',
-        store=True,
         readonly=True
     )
-    
-    # Nom d'affichage
-    display_name = fields.Char(
-        string='Nom d\'affichage',
-        compute='_compute_display_name',
-        store=True
-    )
 
-    @api.depends('employee_id', 'formation_id')
+    def _auto_init(self):
+        res = super()._auto_init()
+        # Index composite pour les filtres, regroupements et comptages d'alertes
+        tools.create_index(
+            self._cr, 'ange_employee_formation_statut_date_alerte_index',
+            self._table, ['statut', 'date_alerte']
+        )
+        return res
+
+    @api.depends('employee_id.name', 'formation_id.name')
     def _compute_display_name(self):
-        """Calculer le nom d'affichage"""
+        """Calculer le nom d'affichage à la volée (noms lus par prefetch)"""
         for record in self:
             if record.employee_id and record.formation_id:
                 record.display_name = f"{record.formation_id.name} - {record.employee_id.name}"
@@ -115,24 +147,16 @@ class HrEmployeeFormation(models.Model):
         """Calculer le statut automatiquement basé sur les dates et la date actuelle"""
         today = fields.Date.today()
         for record in self:
-            if not record.date_debut:
-                record.statut = 'non_fait'
-            elif record.date_debut and not record.date_fin:
-                # Si on a une date de début mais pas de fin
-                if today >= record.date_debut:
-                    record.statut = 'en_cours'
-                else:
-                    record.statut = 'non_fait'
-            elif record.date_debut and record.date_fin:
-                # Si on a les deux dates
-                if today < record.date_debut:
-                    record.statut = 'non_fait'
-                elif record.date_debut <= today <= record.date_fin:
-                    record.statut = 'en_cours'
-                elif today > record.date_fin:
-                    record.statut = 'terminee'
-            else:
-                record.statut = 'non_fait'
+            record.statut = self._get_statut_from_dates(record.date_debut, record.date_fin, today)
+
+    @api.model
+    def _get_statut_from_dates(self, date_debut, date_fin, today):
+        """Statut d'une formation pour des dates données à la date `today`"""
+        if not date_debut or today < date_debut:
+            return 'non_fait'
+        if date_fin and today > date_fin:
+            return 'terminee'
+        return 'en_cours'
 
     @api.depends('date_debut', 'date_fin')
     def _compute_duree_formation(self):
@@ -144,16 +168,81 @@ class HrEmployeeFormation(models.Model):
             else:
                 formation.duree_formation = 0
 
-    @api.depends('date_fin', 'duree_avant_recyclage', 'statut')
+    @api.depends('date_fin', 'formation_id', 'statut')
     def _compute_date_recyclage(self):
         """Calculer automatiquement la date de recyclage"""
         for formation in self:
-            if formation.statut == 'terminee' and formation.date_fin and formation.duree_avant_recyclage > 0:
+            duree = formation.formation_id.duree_avant_recyclage
+            if formation.statut == 'terminee' and formation.date_fin and duree > 0:
                 # Ajouter le nombre de mois à la date de fin
-                formation.date_recyclage = formation.date_fin + relativedelta(months=formation.duree_avant_recyclage)
+                formation.date_recyclage = formation.date_fin + relativedelta(months=duree)
             else:
                 formation.date_recyclage = False
 
+    @api.model
+    def _update_date_recyclage_from_formations(self, formations, batch_size=None):
+        """Recalculer en SQL les dates de recyclage après un changement de durée
+
+        Les dates sont recalculées par lots avec l'arithmétique d'intervalles de
+        PostgreSQL, dont la sémantique des mois (report au dernier jour du mois)
+        est celle de relativedelta. Seules les lignes dont la nouvelle date de
+        recyclage est atteinte sont ensuite réévaluées par l'ORM.
+
+        :return: les lignes passées au statut 'recyclage_requis'
+        """
+        if not formations:
+            return self.browse()
+        settings = get_ange_settings(self.env)
+        batch_size = batch_size or settings['taille_lot_cron']
+        today = fields.Date.today()
+        formations.flush_recordset(['duree_avant_recyclage'])
+        self.flush_model(['formation_id', 'statut', 'date_fin', 'date_recyclage', 'date_alerte'])
+
+        self.env.cr.execute("""
+            SELECT id
+              FROM ange_employee_formation
+             WHERE formation_id IN %s
+               AND statut = 'terminee'
+               AND date_fin IS NOT NULL
+          ORDER BY id
+        """, [tuple(formations.ids)])
+        ids = [row[0] for row in self.env.cr.fetchall()]
+
+        updated_ids = []
+        echues_ids = []
+        for batch_ids in split_every(batch_size, ids):
+            self.env.cr.execute("""
+                UPDATE ange_employee_formation ef
+                   SET date_recyclage = calc.date_recyclage,
+                       date_alerte = calc.date_recyclage - %s
+                  FROM (
+                        SELECT ef2.id,
+                               CASE WHEN f.duree_avant_recyclage > 0
+                                    THEN (ef2.date_fin + make_interval(months => f.duree_avant_recyclage))::date
+                               END AS date_recyclage
+                          FROM ange_employee_formation ef2
+                          JOIN hr_formation f ON f.id = ef2.formation_id
+                         WHERE ef2.id IN %s
+                       ) calc
+                 WHERE calc.id = ef.id
+             RETURNING ef.id, ef.date_recyclage
+            """, [settings['jours_alerte_recyclage'], tuple(batch_ids)])
+            for record_id, date_recyclage in self.env.cr.fetchall():
+                updated_ids.append(record_id)
+                if date_recyclage and date_recyclage <= today:
+                    echues_ids.append(record_id)
+
+        updated = self.browse(updated_ids)
+        updated.invalidate_recordset(['date_recyclage', 'date_alerte'])
+        updated.modified(['date_recyclage', 'date_alerte'])
+        # date_alerte vient d'être écrite par la requête : ne pas la recalculer en Python
+        self.env.remove_to_compute(self._fields['date_alerte'], updated)
+
+        echues = self.browse(echues_ids)
+        for batch_ids in split_every(batch_size, echues_ids):
+            self.browse(batch_ids).write({'statut': 'recyclage_requis'})
+        return echues
+
     @api.depends('date_recyclage')
     def _compute_jours_avant_recyclage(self):
         """Calculer le nombre de jours avant recyclage"""
@@ -165,52 +254,65 @@ class HrEmployeeFormation(models.Model):
             else:
                 formation.jours_avant_recyclage = 0
 
-    @api.depends('date_recyclage', 'statut')
+    def _search_jours_avant_recyclage(self, operator, value):
+        """Recherche pour le champ jours_avant_recyclage (plage sur date_recyclage)"""
+        return days_until_domain('date_recyclage', operator, value, fields.Date.today())
+
+    def _order_field_to_sql(self, alias, field_name, direction, nulls, query):
+        # Trier sur les jours avant recyclage revient à trier sur la date indexée
+        if field_name == 'jours_avant_recyclage':
+            field_name = 'date_recyclage'
+        return super()._order_field_to_sql(alias, field_name, direction, nulls, query)
+
+    @api.depends('date_recyclage')
+    def _compute_date_alerte(self):
+        """Calculer la date d'alerte (date de recyclage moins la fenêtre d'alerte)"""
+        jours_alerte = get_ange_settings(self.env)['jours_alerte_recyclage']
+        for formation in self:
+            if formation.date_recyclage:
+                formation.date_alerte = formation.date_recyclage - timedelta(days=jours_alerte)
+            else:
+                formation.date_alerte = False
+
+    @api.model
+    def _recompute_date_alerte(self):
+        """Recalculer en une requête toutes les dates d'alerte (changement de paramètre)"""
+        jours_alerte = get_ange_settings(self.env)['jours_alerte_recyclage']
+        self.flush_model(['date_recyclage', 'date_alerte'])
+        self.env.cr.execute("""
+            UPDATE ange_employee_formation
+               SET date_alerte = date_recyclage - %s
+             WHERE date_recyclage IS NOT NULL
+        """, [jours_alerte])
+        self.invalidate_model(['date_alerte'])
+
+    @api.depends('date_alerte', 'statut')
     def _compute_alerte_recyclage(self):
         """Calculer si une alerte de recyclage doit être affichée"""
+        today = fields.Date.today()
         for formation in self:
-            if formation.statut == 'terminee' and formation.date_recyclage:
-                # Récupérer le nombre de jours d'alerte depuis les paramètres
-                jours_alerte = self.env['ir.config_parameter'].sudo().get_param(
-                    'ange_sec_employee.jours_alerte_recyclage', '30'
-                )
-                try:
-                    jours_alerte = int(jours_alerte)
-                except ValueError:
-                    jours_alerte = 30
-                
-                today = fields.Date.today()
-                date_limite = formation.date_recyclage - timedelta(days=jours_alerte)
-                formation.alerte_recyclage = today >= date_limite
-            else:
-                formation.alerte_recyclage = False
+            formation.alerte_recyclage = bool(
+                formation.statut == 'terminee'
+                and formation.date_alerte
+                and today >= formation.date_alerte
+            )
 
     def _search_alerte_recyclage(self, operator, value):
         """Recherche pour le champ alerte_recyclage"""
-        jours_alerte = self.env['ir.config_parameter'].sudo().get_param(
-            'ange_sec_employee.jours_alerte_recyclage', '30'
-        )
-        try:
-            jours_alerte = int(jours_alerte)
-        except ValueError:
-            jours_alerte = 30
-        
         today = fields.Date.today()
-        date_limite = today + timedelta(days=jours_alerte)
         
         if operator == '=' and value:
             return [
                 ('statut', '=', 'terminee'),
-                ('date_recyclage', '!=', False),
-                ('date_recyclage', '<=', date_limite)
+                ('date_alerte', '<=', today)
             ]
         elif operator == '=' and not value:
             return [
                 '|',
                 ('statut', '!=', 'terminee'),
                 '|',
-                ('date_recyclage', '=', False),
-                ('date_recyclage', '>', date_limite)
+                ('date_alerte', '=', False),
+                ('date_alerte', '>', today)
             ]
         return []
 
@@ -244,34 +346,90 @@ class HrEmployeeFormation(models.Model):
                         _('La date de début doit être antérieure à la date de fin.')
                     )
 
-    @api.constrains('employee_id', 'formation_id')
-    def _check_unique_employee_formation(self):
-        """Vérifier qu'un employé n'a qu'un seul enregistrement par formation"""
-        for record in self:
-            if record.employee_id and record.formation_id:
-                existing = self.search([
-                    ('employee_id', '=', record.employee_id.id),
-                    ('formation_id', '=', record.formation_id.id),
-                    ('id', '!=', record.id)
-                ])
-                if existing:
-                    raise models.ValidationError(
-                        _('Cet employé a déjà un enregistrement pour cette formation.')
-                    )
+    @api.model
+    def cron_update_recyclage_status(self, batch_size=None):
+        """Cron job pour mettre à jour automatiquement les statuts de recyclage
+
+        Les formations échues sont traitées par lots : une seule écriture
+        groupée par lot, suivie d'un commit. Le domaine sert lui-même de point
+        de reprise : une ligne traitée quitte le statut 'terminee', donc un
+        worker interrompu reprend au lot suivant lors de la prochaine exécution.
+
+        :return: dictionnaire {id de la formation: nombre de lignes passées en recyclage}
+        """
+        batch_size = batch_size or get_ange_settings(self.env)['taille_lot_cron']
+        groups = self._read_group(
+            [
+                ('statut', '=', 'terminee'),
+                ('date_recyclage', '!=', False),
+                ('date_recyclage', '<=', fields.Date.today()),
+            ],
+            ['formation_id'],
+            ['id:array_agg'],
+        )
+
+        rapport = {}
+        for formation, ids in groups:
+            for batch_ids in split_every(batch_size, sorted(ids)):
+                self.browse(batch_ids).write({'statut': 'recyclage_requis'})
+                commit_cron_batch(self.env)
+                rapport[formation.id] = rapport.get(formation.id, 0) + len(batch_ids)
+            _logger.info(
+                "Recyclage requis : %s ligne(s) pour la formation %s (id %s)",
+                rapport[formation.id], formation.name, formation.id
+            )
+
+        return rapport
 
     @api.model
-    def cron_update_recyclage_status(self):
-        """Cron job pour mettre à jour automatiquement les statuts de recyclage"""
-        formations_terminees = self.search([
-            ('statut', '=', 'terminee'),
-            ('date_recyclage', '!=', False),
-            ('date_recyclage', '<=', fields.Date.today())
-        ])
-        
-        for formation in formations_terminees:
-            formation.statut = 'recyclage_requis'
-        
-        return len(formations_terminees)
+    def cron_update_statut_transitions(self, batch_size=None):
+        """Cron job faisant avancer les statuts dépendant du calendrier
+
+        Seules les lignes dont une borne (date de début ou de fin) a été
+        franchie depuis la dernière exécution sont relues, via une recherche
+        par plage sur les colonnes indexées date_debut / date_fin. La date de
+        dernière exécution est initialisée à l'installation (cron_data.xml) ;
+        sans elle (module mis à jour depuis une version antérieure), le premier
+        passage relit toutes les lignes non terminées.
+
+        :return: nombre de lignes dont le statut a changé
+        """
+        batch_size = batch_size or get_ange_settings(self.env)['taille_lot_cron']
+        today = fields.Date.today()
+        ICP = self.env['ir.config_parameter'].sudo()
+        last_run = fields.Date.to_date(ICP.get_param(STATUT_LAST_RUN_PARAM) or False)
+
+        # statut 'en_cours' dès que today >= date_debut,
+        # statut 'terminee' dès que today > date_fin
+        debut_domain = [('date_debut', '<=', today)]
+        fin_domain = [('date_fin', '<', today)]
+        if last_run:
+            if last_run >= today:
+                return 0
+            debut_domain.append(('date_debut', '>', last_run))
+            fin_domain.append(('date_fin', '>=', last_run))
+
+        records = self.search(expression.AND([
+            [('statut', 'in', ('non_fait', 'en_cours'))],
+            expression.OR([debut_domain, fin_domain]),
+        ]))
+
+        ids_par_statut = defaultdict(list)
+        for record in records:
+            statut = self._get_statut_from_dates(record.date_debut, record.date_fin, today)
+            if statut != record.statut:
+                ids_par_statut[statut].append(record.id)
+
+        nb_changes = 0
+        for statut, ids in ids_par_statut.items():
+            for batch_ids in split_every(batch_size, ids):
+                self.browse(batch_ids).write({'statut': statut})
+                commit_cron_batch(self.env)
+                nb_changes += len(batch_ids)
+
+        ICP.set_param(STATUT_LAST_RUN_PARAM, fields.Date.to_string(today))
+        _logger.info("Transitions de statut de formation : %s ligne(s) mise(s) à jour", nb_changes)
+        return nb_changes
 
     def action_marquer_en_cours(self):
         """Action pour marquer la formation comme en cours"""
@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime, time, timedelta
+
+import pytz
+
 from odoo import models, fields, api, _
 
+# Champs dont dépend la couverture horaire (ange.faction.coverage)
+COVERAGE_FIELDS = {'heure_debut', 'heure_fin', 'type_faction', 'active'}
+
 
 class HrFaction(models.Model):
     """Modèle pour gérer les factions de travail des employés"""
@@ -59,11 +66,54 @@ class HrFaction(models.Model):
         help='Nombre d\'employés assignés à cette faction'
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Programmer le calcul de la couverture horaire des nouvelles factions"""
+        factions = super().create(vals_list)
+        self.env['ange.faction.coverage']._mark_to_rebuild(factions.ids)
+        return factions
+
+    def write(self, vals):
+        """Programmer le recalcul de la couverture si les horaires ou le type changent"""
+        result = super().write(vals)
+        if COVERAGE_FIELDS & vals.keys():
+            self.env['ange.faction.coverage']._mark_to_rebuild(self.ids)
+        return result
+
     @api.depends('employee_ids')
     def _compute_nb_employees(self):
-        """Calculer le nombre d'employés par faction"""
+        """Calculer le nombre d'employés par faction en une requête groupée"""
+        counts = {}
+        factions = self.filtered('id')
+        if factions:
+            counts = dict(self.env['hr.employee']._read_group(
+                [('faction_id', 'in', factions.ids)],
+                ['faction_id'],
+                ['__count'],
+            ))
         for faction in self:
-            faction.nb_employees = len(faction.employee_ids)
+            faction.nb_employees = counts.get(faction, 0)
+
+    def _get_shift_interval(self, date_service, tz_name):
+        """Intervalle de la vacation débutant le jour date_service, en UTC naïf
+
+        Les heures de la faction sont exprimées dans le fuseau de l'employé
+        (tz_name). Une faction dont l'heure de fin n'est pas postérieure à
+        l'heure de début (faction de nuit) se termine le lendemain.
+
+        :return: tuple (début, fin) de datetimes UTC sans fuseau
+        """
+        self.ensure_one()
+        tz = pytz.timezone(tz_name or 'UTC')
+        minuit = datetime.combine(date_service, time.min)
+        debut = minuit + timedelta(hours=self.heure_debut)
+        fin = minuit + timedelta(hours=self.heure_fin)
+        if fin <= debut:
+            fin += timedelta(days=1)
+        return tuple(
+            tz.localize(moment).astimezone(pytz.utc).replace(tzinfo=None)
+            for moment in (debut, fin)
+        )
 
     def name_get(self):
         """Personnaliser l'affichage du nom avec les horaires"""
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api, _
+from odoo.osv import expression
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
+from .stats_utils import count_by_statut
+
 
 class HrFormation(models.Model):
     """Modèle pour gérer les formations (catalogue de formations)"""
@@ -57,61 +60,92 @@ class HrFormation(models.Model):
     nb_employes_total = fields.Integer(
         string='Nombre d\'employés total',
         compute='_compute_statistiques',
+        store=True,
         help='Nombre total d\'employés assignés à cette formation'
     )
     
     nb_employes_termines = fields.Integer(
         string='Nombre d\'employés ayant terminé',
         compute='_compute_statistiques',
+        store=True,
         help='Nombre d\'employés ayant terminé cette formation'
     )
     
     nb_employes_en_cours = fields.Integer(
         string='Nombre d\'employés en cours',
         compute='_compute_statistiques',
+        store=True,
         help='Nombre d\'employés en cours de formation'
     )
     
     nb_employes_recyclage = fields.Integer(
         string='Nombre d\'employés en recyclage',
         compute='_compute_statistiques',
+        store=True,
         help='Nombre d\'employés nécessitant un recyclage'
     )
     
     pourcentage_completion = fields.Float(
         string='Pourcentage de complétion',
         compute='_compute_statistiques',
+        store=True,
         help='Pourcentage d\'employés ayant terminé la formation'
     )
     
     @api.depends('employee_formation_ids.statut')
     def _compute_statistiques(self):
-        """Calculer les statistiques de la formation"""
+        """Calculer les statistiques de la formation en une requête groupée"""
+        counts = count_by_statut(self, 'ange.employee.formation', 'formation_id')
+
         for formation in self:
-            employee_formations = formation.employee_formation_ids
-            formation.nb_employes_total = len(employee_formations)
-            formation.nb_employes_termines = len(employee_formations.filtered(lambda ef: ef.statut == 'terminee'))
-            formation.nb_employes_en_cours = len(employee_formations.filtered(lambda ef: ef.statut == 'en_cours'))
-            formation.nb_employes_recyclage = len(employee_formations.filtered(lambda ef: ef.statut == 'recyclage_requis'))
+            formation.nb_employes_total = counts[formation.id, None]
+            formation.nb_employes_termines = counts[formation.id, 'terminee']
+            formation.nb_employes_en_cours = counts[formation.id, 'en_cours']
+            formation.nb_employes_recyclage = counts[formation.id, 'recyclage_requis']
             
             if formation.nb_employes_total > 0:
                 formation.pourcentage_completion = (formation.nb_employes_termines / formation.nb_employes_total) * 100
             else:
                 formation.pourcentage_completion = 0.0
 
+    def write(self, vals):
+        """Propager un changement de durée de recyclage en une mise à jour groupée"""
+        result = super().write(vals)
+        if self and 'duree_avant_recyclage' in vals:
+            self.env['ange.employee.formation']._update_date_recyclage_from_formations(self)
+        return result
+
     def action_assign_employees(self):
         """Action pour assigner des employés à cette formation"""
         return {
             'type': 'ir.actions.act_window',
-            'name': f'Assigner un employé à {self.name}',
-            'res_model': 'ange.employee.formation',
+            'name': f'Assigner des employés à {self.name}',
+            'res_model': 'ange.formation.enrollment.wizard',
             'view_mode': 'form',
             'target': 'new',
             'context': {
                 'default_formation_id': self.id,
-                'default_statut': 'non_fait'
             }
         }
+
+    def _enroll_employees(self, employee_domain):
+        """Inscrire en masse les employés correspondant au domaine
+
+        Les employés déjà inscrits sont écartés par un anti-join dans la même
+        requête de recherche, puis les inscriptions manquantes sont créées en
+        un seul lot.
+
+        :return: les enregistrements ange.employee.formation créés
+        """
+        self.ensure_one()
+        employees = self.env['hr.employee'].search(expression.AND([
+            employee_domain,
+            [('formation_ids', 'not any', [('formation_id', '=', self.id)])],
+        ]))
+        return self.env['ange.employee.formation'].create([
+            {'employee_id': employee.id, 'formation_id': self.id}
+            for employee in employees
+        ])
     
     def action_view_employee_formations(self):
         """Action pour voir les statuts des employés pour cette formation"""
@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api
 
+from .ange_settings import get_ange_settings
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
@@ -13,6 +15,60 @@ class ResConfigSettings(models.TransientModel):
         help='Nombre de jours avant la date de recyclage pour déclencher une alerte'
     )
 
+    taille_lot_cron = fields.Integer(
+        string='Taille des lots des tâches planifiées',
+        default=1000,
+        config_parameter='ange_sec_employee.taille_lot_cron',
+        help='Nombre d\'enregistrements écrits puis validés par lot dans les tâches planifiées'
+    )
+
+    jours_alerte_documents = fields.Integer(
+        string='Jours d\'alerte avant expiration des documents',
+        default=30,
+        config_parameter='ange_sec_employee.jours_alerte_documents',
+        help='Nombre de jours avant l\'expiration de la CNI ou de la carte de séjour pour déclencher une alerte'
+    )
+
+    jours_alerte_equipement = fields.Integer(
+        string='Jours d\'alerte avant renouvellement des équipements',
+        default=30,
+        config_parameter='ange_sec_employee.jours_alerte_equipement',
+        help='Horizon (en jours) du récapitulatif des équipements à renouveler envoyé aux responsables'
+    )
+
+    mois_validite_visite = fields.Integer(
+        string='Validité d\'une visite médicale (mois)',
+        default=12,
+        config_parameter='ange_sec_employee.mois_validite_visite',
+        help='Durée pendant laquelle une visite médicale effectuée rend l\'agent déployable'
+    )
+
+    responsable_documents_id = fields.Many2one(
+        'res.users',
+        string='Responsable RH des documents d\'identité',
+        config_parameter='ange_sec_employee.responsable_documents_id',
+        domain=[('share', '=', False)],
+        help='Utilisateur à qui sont assignées les activités de renouvellement des documents '
+             'd\'identité ; à défaut, un administrateur RH de la société de l\'employé'
+    )
+
+    heures_repos_min = fields.Integer(
+        string='Repos minimal entre deux vacations (heures)',
+        default=11,
+        config_parameter='ange_sec_employee.heures_repos_min',
+        help='Durée minimale de repos exigée entre la fin d\'une vacation et le début de la suivante'
+    )
+
+    def set_values(self):
+        """Invalider le cache des paramètres du module après enregistrement"""
+        settings_precedents = get_ange_settings(self.env)
+        super().set_values()
+        self.env['ange.settings']._invalidate_settings()
+        if self.jours_alerte_recyclage != settings_precedents['jours_alerte_recyclage']:
+            self.env['ange.employee.formation']._recompute_date_alerte()
+        if self.mois_validite_visite != settings_precedents['mois_validite_visite']:
+            self.env['hr.employee'].with_context(active_test=False).search([])._recompute_deployable()
+
     @api.constrains('jours_alerte_recyclage')
     def _check_jours_alerte_recyclage(self):
         """Vérifier que le nombre de jours est positif"""
@@ -21,3 +77,48 @@ class ResConfigSettings(models.TransientModel):
                 raise models.ValidationError(
                     'Le nombre de jours d\'alerte doit être positif.'
                 )
+
+    @api.constrains('jours_alerte_documents')
+    def _check_jours_alerte_documents(self):
+        """Vérifier que le nombre de jours est positif"""
+        for record in self:
+            if record.jours_alerte_documents < 0:
+                raise models.ValidationError(
+                    'Le nombre de jours d\'alerte doit être positif.'
+                )
+
+    @api.constrains('jours_alerte_equipement')
+    def _check_jours_alerte_equipement(self):
+        """Vérifier que le nombre de jours est positif"""
+        for record in self:
+            if record.jours_alerte_equipement < 0:
+                raise models.ValidationError(
+                    'Le nombre de jours d\'alerte doit être positif.'
+                )
+
+    @api.constrains('mois_validite_visite')
+    def _check_mois_validite_visite(self):
+        """Vérifier que la durée de validité est strictement positive"""
+        for record in self:
+            if record.mois_validite_visite <= 0:
+                raise models.ValidationError(
+                    'La durée de validité d\'une visite médicale doit être strictement positive.'
+                )
+
+    @api.constrains('heures_repos_min')
+    def _check_heures_repos_min(self):
+        """Vérifier que la durée de repos est positive"""
+        for record in self:
+            if record.heures_repos_min < 0:
+                raise models.ValidationError(
+                    'La durée de repos minimal doit être positive.'
+                )
+
+    @api.constrains('taille_lot_cron')
+    def _check_taille_lot_cron(self):
+        """Vérifier que la taille des lots est strictement positive"""
+        for record in self:
+            if record.taille_lot_cron <= 0:
+                raise models.ValidationError(
+                    'La taille des lots doit être strictement positive.'
+                )
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import format_datetime
+
+from .ange_settings import get_ange_settings
+from .roster_utils import find_roster_violations
+
+_logger = logging.getLogger(__name__)
+
+
+class RosterShift(models.Model):
+    """Vacation planifiée d'un employé, issue de sa faction de travail"""
+    _name = 'ange.roster.shift'
+    _description = 'Vacation planifiée'
+    _order = 'date_service desc, date_debut, employee_id'
+    _rec_names_search = ['employee_id.name', 'faction_id.name']
+
+    _sql_constraints = [
+        ('employee_date_uniq', 'unique(employee_id, date_service)',
+         'Un employé ne peut avoir qu\'une vacation par jour de service.'),
+    ]
+
+    employee_id = fields.Many2one(
+        'hr.employee',
+        string='Employé',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    faction_id = fields.Many2one(
+        'hr.faction',
+        string='Faction',
+        required=True,
+        ondelete='restrict',
+        index=True
+    )
+
+    type_faction = fields.Selection(
+        related='faction_id.type_faction',
+        string='Type de faction'
+    )
+
+    date_service = fields.Date(
+        string='Jour de service',
+        required=True,
+        index=True,
+        help='Jour (dans le fuseau de l\'employé) où débute la vacation'
+    )
+
+    date_debut = fields.Datetime(
+        string='Début',
+        required=True,
+        index=True
+    )
+
+    date_fin = fields.Datetime(
+        string='Fin',
+        required=True,
+        help='Fin de la vacation, le lendemain pour une faction de nuit'
+    )
+
+    department_id = fields.Many2one(
+        related='employee_id.department_id',
+        string='Département'
+    )
+
+    @api.depends('employee_id.name', 'faction_id.name', 'date_service')
+    def _compute_display_name(self):
+        """Calculer le nom d'affichage à la volée (noms lus par prefetch)"""
+        for shift in self:
+            shift.display_name = f"{shift.employee_id.name} - {shift.faction_id.name} ({shift.date_service})"
+
+    @api.onchange('faction_id', 'date_service', 'employee_id')
+    def _onchange_faction_date(self):
+        """Proposer l'intervalle de la faction pour le jour de service"""
+        if self.faction_id and self.date_service:
+            self.date_debut, self.date_fin = self.faction_id._get_shift_interval(
+                self.date_service, self.employee_id.tz
+            )
+
+    @api.constrains('date_debut', 'date_fin')
+    def _check_dates(self):
+        """Vérifier que la vacation se termine après son début"""
+        for shift in self:
+            if shift.date_fin <= shift.date_debut:
+                raise ValidationError(_('La fin de la vacation doit être postérieure à son début.'))
+
+    @api.constrains('employee_id', 'date_debut', 'date_fin')
+    def _check_repos(self):
+        """Refuser les chevauchements et les repos insuffisants entre vacations
+
+        Les vacations voisines des employés concernés sont lues en une requête ;
+        toutes les violations sont signalées ensemble.
+        """
+        repos_min = self._get_repos_min()
+        voisines = self.search_fetch([
+            ('employee_id', 'in', self.employee_id.ids),
+            ('date_fin', '>', min(self.mapped('date_debut')) - repos_min),
+            ('date_debut', '<', max(self.mapped('date_fin')) + repos_min),
+        ], ['employee_id', 'date_debut', 'date_fin'])
+        violations = [
+            violation
+            for violation in find_roster_violations(voisines._get_roster_intervals(), repos_min)
+            if violation.precedente[3] in self.ids or violation.suivante[3] in self.ids
+        ]
+        if violations:
+            raise ValidationError('\n'.join(self._format_roster_violations(violations)))
+
+    @api.model
+    def _get_repos_min(self):
+        """Repos minimal entre deux vacations (paramètre heures_repos_min)"""
+        return timedelta(hours=get_ange_settings(self.env)['heures_repos_min'])
+
+    def _get_roster_intervals(self):
+        """Intervalles (employee_id, début, fin, id) des vacations pour le validateur"""
+        return [(shift.employee_id.id, shift.date_debut, shift.date_fin, shift.id) for shift in self]
+
+    @api.model
+    def _format_roster_violations(self, violations):
+        """Messages lisibles des violations du planning (heures dans le fuseau de l'utilisateur)"""
+        employees = self.env['hr.employee'].browse({violation.employee_id for violation in violations})
+        noms = {employee.id: employee.name for employee in employees}
+        messages = []
+        for violation in violations:
+            valeurs = {
+                'employee': noms[violation.employee_id],
+                'fin': format_datetime(self.env, violation.precedente[2], dt_format='short'),
+                'debut': format_datetime(self.env, violation.suivante[1], dt_format='short'),
+                'heures': round(violation.ecart.total_seconds() / 3600, 1),
+            }
+            if violation.type == 'chevauchement':
+                messages.append(_('%(employee)s : la vacation débutant le %(debut)s chevauche '
+                                  'une vacation se terminant le %(fin)s.', **valeurs))
+            else:
+                messages.append(_('%(employee)s : seulement %(heures)s h de repos entre la vacation '
+                                  'se terminant le %(fin)s et celle débutant le %(debut)s.', **valeurs))
+        return messages
+
+    def action_verifier_planning(self):
+        """Vérifier les vacations sélectionnées (chevauchements et temps de repos)"""
+        violations = find_roster_violations(self._get_roster_intervals(), self._get_repos_min())
+        if violations:
+            raise UserError('\n'.join(self._format_roster_violations(violations)))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Planning conforme'),
+                'message': _('%s vacation(s) vérifiée(s) : aucun chevauchement ni repos insuffisant.') % len(self),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    @api.model
+    def _validate_faction_reassignment(self, employees, faction, date_from=None):
+        """Vérifier, sans rien écrire, le passage des employés sur une autre faction
+
+        Les vacations planifiées à partir de date_from (aujourd'hui par défaut)
+        sont remplacées par celles de la nouvelle faction ; les vacations
+        antérieures encore proches sont conservées pour contrôler le repos à la
+        transition. Toutes les violations sont renvoyées en un seul passage.
+
+        :return: liste de messages, vide si la réaffectation est valide
+        """
+        date_from = date_from or fields.Date.today()
+        repos_min = self._get_repos_min()
+        shifts = self.search_fetch([
+            ('employee_id', 'in', employees.ids),
+            ('date_fin', '>', datetime.combine(date_from, time.min) - timedelta(days=1) - repos_min),
+        ], ['employee_id', 'date_service', 'date_debut', 'date_fin'])
+
+        intervals = []
+        nouveaux_intervalles = {}
+        for shift in shifts:
+            date_debut, date_fin = shift.date_debut, shift.date_fin
+            if shift.date_service >= date_from:
+                key = (shift.employee_id.tz, shift.date_service)
+                if key not in nouveaux_intervalles:
+                    nouveaux_intervalles[key] = faction._get_shift_interval(shift.date_service, shift.employee_id.tz)
+                date_debut, date_fin = nouveaux_intervalles[key]
+            intervals.append((shift.employee_id.id, date_debut, date_fin, shift.id))
+        return self._format_roster_violations(find_roster_violations(intervals, repos_min))
+
+    @api.model
+    def _generate_shifts(self, employees, date_from, date_to, faction=None):
+        """Planifier les vacations des employés du date_from au date_to inclus
+
+        Chaque employé reçoit une vacation par jour, sur sa faction par défaut
+        (ou sur `faction` si elle est fournie). Les couples (employé, jour)
+        déjà planifiés sont ignorés : une régénération sur une période qui
+        chevauche un planning existant est sans effet sur celui-ci.
+        Les intervalles sont calculés une fois par faction, fuseau et jour,
+        et toutes les vacations sont créées en un seul appel.
+
+        :return: vacations créées
+        """
+        if not faction:
+            employees = employees.filtered('faction_id')
+        if not employees or date_from > date_to:
+            return self.browse()
+
+        existing = {
+            employee.id: set(dates)
+            for employee, dates in self._read_group(
+                [
+                    ('employee_id', 'in', employees.ids),
+                    ('date_service', '>=', date_from),
+                    ('date_service', '<=', date_to),
+                ],
+                ['employee_id'],
+                ['date_service:array_agg'],
+            )
+        }
+
+        dates = [
+            date_from + timedelta(days=offset)
+            for offset in range((date_to - date_from).days + 1)
+        ]
+        intervals = {}
+        vals_list = []
+        for employee in employees:
+            employee_faction = faction or employee.faction_id
+            planned = existing.get(employee.id, ())
+            for date_service in dates:
+                if date_service in planned:
+                    continue
+                key = (employee_faction.id, employee.tz, date_service)
+                if key not in intervals:
+                    intervals[key] = employee_faction._get_shift_interval(date_service, employee.tz)
+                date_debut, date_fin = intervals[key]
+                vals_list.append({
+                    'employee_id': employee.id,
+                    'faction_id': employee_faction.id,
+                    'date_service': date_service,
+                    'date_debut': date_debut,
+                    'date_fin': date_fin,
+                })
+
+        shifts = self.create(vals_list)
+        _logger.info(
+            "Planning : %s vacation(s) créée(s) pour %s employé(s) du %s au %s",
+            len(shifts), len(employees), date_from, date_to
+        )
+        return shifts
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict, namedtuple
+
+# Violation du planning entre deux vacations consécutives d'un même employé.
+# precedente / suivante sont les intervalles (employee_id, début, fin, référence)
+# concernés, ecart la durée qui les sépare (négative en cas de chevauchement).
+RosterViolation = namedtuple('RosterViolation', ['employee_id', 'type', 'precedente', 'suivante', 'ecart'])
+
+
+def find_roster_violations(intervals, repos_min):
+    """Trouver tous les chevauchements et repos insuffisants d'un planning
+
+    Les intervalles sont regroupés par employé puis triés par début ; un seul
+    balayage compare chaque vacation à la vacation précédente se terminant le
+    plus tard, ce qui détecte aussi les vacations contenues dans une autre.
+
+    :param intervals: itérable de tuples (employee_id, début, fin, référence)
+    :param repos_min: timedelta, repos minimal entre deux vacations
+    :return: liste de RosterViolation, de type 'chevauchement' ou 'repos'
+    """
+    par_employe = defaultdict(list)
+    for interval in intervals:
+        par_employe[interval[0]].append(interval)
+
+    violations = []
+    for employee_id, employee_intervals in par_employe.items():
+        employee_intervals.sort(key=lambda interval: (interval[1], interval[2]))
+        precedente = None
+        for interval in employee_intervals:
+            if precedente:
+                ecart = interval[1] - precedente[2]
+                if ecart.total_seconds() < 0:
+                    violations.append(RosterViolation(employee_id, 'chevauchement', precedente, interval, ecart))
+                elif ecart < repos_min:
+                    violations.append(RosterViolation(employee_id, 'repos', precedente, interval, ecart))
+            if not precedente or interval[2] > precedente[2]:
+                precedente = interval
+    return violations
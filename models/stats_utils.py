@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+
+def count_by_statut(records, model_name, field_name):
+    """Compter en une requête les lignes de model_name par enregistrement et par statut
+
+    :param records: enregistrements référencés par le champ field_name de model_name
+    :return: defaultdict {(record_id, statut): nombre}, la clé (record_id, None)
+             donnant le total de l'enregistrement
+    """
+    counts = defaultdict(int)
+    records = records.filtered('id')
+    if records:
+        for record, statut, count in records.env[model_name]._read_group(
+            [(field_name, 'in', records.ids)],
+            [field_name, 'statut'],
+            ['__count'],
+        ):
+            counts[record.id, statut] += count
+            counts[record.id, None] += count
+    return counts
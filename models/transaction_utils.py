@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+
+def commit_cron_batch(env):
+    """Valider le lot courant d'un cron (sauf en mode test)"""
+    if not env.registry.in_test_mode():
+        env.cr.commit()
+
+
+def mark_precommit_pending(env, key, ids, callback):
+    """Accumuler des identifiants à traiter en une fois juste avant le commit
+
+    Les identifiants sont regroupés sous `key` dans cr.precommit.data ; au
+    premier marquage de la transaction, `callback` est programmé et sera
+    appelé une seule fois avec l'ensemble des identifiants accumulés.
+    """
+    if not ids:
+        return
+    data = env.cr.precommit.data
+    pending = data.setdefault(key, set())
+    if not pending:
+        env.cr.precommit.add(lambda: callback(data.pop(key, set())))
+    pending.update(ids)
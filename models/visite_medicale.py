@@ -32,6 +32,7 @@ class VisiteMedicale(models.Model):
         'hr.employee',
         string='Employé',
         required=True,
+        index=True,
         help='Employé concerné par cette visite médicale'
     )
     
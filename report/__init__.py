@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import ange_employee_compliance_summary
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, tools
+
+
+class AngeEmployeeComplianceSummary(models.Model):
+    """Synthèse de conformité par employé (vue SQL en lecture seule)"""
+    _name = 'ange.employee.compliance.summary'
+    _description = 'Synthèse de conformité des employés'
+    _auto = False
+    _order = 'employee_id'
+    _rec_name = 'employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employé', readonly=True)
+    company_id = fields.Many2one('res.company', string='Société', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Département', readonly=True)
+    faction_id = fields.Many2one('hr.faction', string='Faction', readonly=True)
+    matricule_agent = fields.Char(string='Matricule agent', readonly=True)
+    active = fields.Boolean(string='Actif', readonly=True)
+
+    # Formations
+    nb_formations_total = fields.Integer(string='Formations', readonly=True)
+    nb_formations_terminees = fields.Integer(string='Formations terminées', readonly=True)
+    nb_formations_en_cours = fields.Integer(string='Formations en cours', readonly=True)
+    nb_formations_non_faites = fields.Integer(string='Formations non effectuées', readonly=True)
+    nb_formations_recyclage = fields.Integer(string='Formations à recycler', readonly=True)
+
+    # Équipements
+    nb_equipements_actifs = fields.Integer(string='Équipements actifs', readonly=True)
+    nb_equipements_expires = fields.Integer(string='Équipements expirés', readonly=True)
+
+    # Santé et documents
+    nb_visites_en_retard = fields.Integer(
+        string='Visites médicales en retard',
+        readonly=True,
+        help='Visites médicales non effectuées dont la date est dépassée'
+    )
+    date_validite_cni = fields.Date(string='Date de validité CNI', readonly=True)
+    date_validite_carte_sejour = fields.Date(string='Date de validité carte de séjour', readonly=True)
+    nb_documents_expirants = fields.Integer(
+        string='Documents expirants',
+        readonly=True,
+        help='Pièces d\'identité expirées ou expirant dans la fenêtre d\'alerte configurée'
+    )
+
+    conforme = fields.Boolean(
+        string='Conforme',
+        readonly=True,
+        help='Aucune formation à recycler, aucun équipement expiré, '
+             'aucune visite en retard et aucun document expirant'
+    )
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW %s AS (
+                WITH parametres AS (
+                    SELECT COALESCE((
+                        SELECT CASE WHEN value ~ '^[0-9]+$' THEN value::integer END
+                          FROM ir_config_parameter
+                         WHERE key = 'ange_sec_employee.jours_alerte_documents'
+                    ), 30) AS jours_alerte_documents
+                ),
+                formations AS (
+                    SELECT employee_id,
+                           COUNT(*) AS nb_total,
+                           COUNT(*) FILTER (WHERE statut = 'terminee') AS nb_terminees,
+                           COUNT(*) FILTER (WHERE statut = 'en_cours') AS nb_en_cours,
+                           COUNT(*) FILTER (WHERE statut = 'non_fait') AS nb_non_faites,
+                           COUNT(*) FILTER (WHERE statut = 'recyclage_requis') AS nb_recyclage
+                      FROM ange_employee_formation
+                  GROUP BY employee_id
+                ),
+                equipements AS (
+                    SELECT employee_id,
+                           COUNT(*) FILTER (WHERE statut = 'actif') AS nb_actifs,
+                           COUNT(*) FILTER (WHERE statut = 'expire') AS nb_expires
+                      FROM ange_employee_equipement
+                     WHERE statut IN ('actif', 'expire')
+                  GROUP BY employee_id
+                ),
+                visites AS (
+                    SELECT employee_id,
+                           COUNT(*) AS nb_en_retard
+                      FROM visite_medicale
+                     WHERE fait IS NOT TRUE
+                       AND date < CURRENT_DATE
+                  GROUP BY employee_id
+                ),
+                synthese AS (
+                    SELECT e.id AS id,
+                           e.id AS employee_id,
+                           e.company_id AS company_id,
+                           e.department_id AS department_id,
+                           e.faction_id AS faction_id,
+                           e.matricule_agent AS matricule_agent,
+                           e.active AS active,
+                           COALESCE(f.nb_total, 0) AS nb_formations_total,
+                           COALESCE(f.nb_terminees, 0) AS nb_formations_terminees,
+                           COALESCE(f.nb_en_cours, 0) AS nb_formations_en_cours,
+                           COALESCE(f.nb_non_faites, 0) AS nb_formations_non_faites,
+                           COALESCE(f.nb_recyclage, 0) AS nb_formations_recyclage,
+                           COALESCE(q.nb_actifs, 0) AS nb_equipements_actifs,
+                           COALESCE(q.nb_expires, 0) AS nb_equipements_expires,
+                           COALESCE(v.nb_en_retard, 0) AS nb_visites_en_retard,
+                           e.date_validite_cni AS date_validite_cni,
+                           e.date_validite_carte_sejour AS date_validite_carte_sejour,
+                           (CASE WHEN e.date_validite_cni <= CURRENT_DATE + p.jours_alerte_documents
+                                 THEN 1 ELSE 0 END
+                            + CASE WHEN e.date_validite_carte_sejour <= CURRENT_DATE + p.jours_alerte_documents
+                                   THEN 1 ELSE 0 END) AS nb_documents_expirants
+                      FROM hr_employee e
+                CROSS JOIN parametres p
+                 LEFT JOIN formations f ON f.employee_id = e.id
+                 LEFT JOIN equipements q ON q.employee_id = e.id
+                 LEFT JOIN visites v ON v.employee_id = e.id
+                )
+                SELECT synthese.*,
+                       (nb_formations_recyclage = 0
+                        AND nb_equipements_expires = 0
+                        AND nb_visites_en_retard = 0
+                        AND nb_documents_expirants = 0) AS conforme
+                  FROM synthese
+            )
+        """ % self._table)
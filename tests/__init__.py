@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from . import test_rename_performance
+from . import test_recyclage_dates
+from . import test_employee_form_performance
+from . import test_matricule_search
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+from odoo.tests import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+class BenchmarkCase(TransactionCase):
+    """Base des bancs d'essai : nombre de requêtes et durée d'une opération à cache vide"""
+
+    def _measure(self, label, operation):
+        """Exécuter operation() à cache vide puis vider les écritures en attente
+
+        :return: tuple (nombre de requêtes, durée en secondes)
+        """
+        self.env.invalidate_all()
+        queries_before = self.cr.sql_log_count
+        start = time.perf_counter()
+        operation()
+        self.env.flush_all()
+        queries = self.cr.sql_log_count - queries_before
+        duration = time.perf_counter() - start
+        _logger.info("%s : %s requête(s), %.3f s", label, queries, duration)
+        return queries, duration
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from lxml import etree
+
+from odoo.tests import tagged
+
+from .common import BenchmarkCase
+
+# Compteurs affichés dans les boutons statistiques des onglets Ange Security
+COUNTER_FIELDS = (
+    'nb_formations_total',
+    'nb_formations_terminees',
+    'nb_formations_en_cours',
+    'nb_formations_recyclage',
+    'nb_equipements_actifs',
+    'nb_equipements_expires',
+)
+
+# Listes des onglets Ange Security, paginées dans la vue formulaire
+ONE2MANY_FIELDS = ('formation_ids', 'equipement_ids', 'visite_medicale_ids')
+
+
+@tagged('post_install', '-at_install')
+class TestEmployeeFormPerformance(BenchmarkCase):
+    """Mesure de l'ouverture du formulaire employé selon l'historique de l'agent"""
+
+    def _form_specification(self):
+        """Construire la spécification web_read des onglets Ange Security depuis la vue formulaire"""
+        Employee = self.env['hr.employee']
+        arch = Employee.get_views([(False, 'form')])['views']['form']['arch']
+        form = etree.fromstring(arch)
+        specification = {name: {} for name in COUNTER_FIELDS}
+        for name in ONE2MANY_FIELDS:
+            list_node = form.find(f".//field[@name='{name}']/list")
+            self.assertIsNotNone(list_node, f"Liste {name} absente du formulaire employé")
+            self.assertTrue(list_node.get('limit'), f"La liste {name} du formulaire doit être paginée")
+            comodel = self.env[Employee._fields[name].comodel_name]
+            subfields = {}
+            for field_node in list_node.iter('field'):
+                field_name = field_node.get('name')
+                subfields[field_name] = (
+                    {'fields': {'display_name': {}}} if comodel._fields[field_name].relational else {}
+                )
+            specification[name] = {'fields': subfields, 'limit': int(list_node.get('limit'))}
+        return specification
+
+    def _create_employee(self, nb_lignes):
+        """Créer un employé avec nb_lignes formations, équipements et visites médicales"""
+        employee = self.env['hr.employee'].create({'name': f'Agent {nb_lignes}'})
+        formations = self.env['hr.formation'].create([
+            {'name': f'Formation {index}'} for index in range(nb_lignes)
+        ])
+        equipement = self.env['ange.equipement'].create({
+            'name': 'Tenue',
+            'periode_renouvellement': 12,
+        })
+        self.env['ange.employee.formation'].create([
+            {'employee_id': employee.id, 'formation_id': formation.id}
+            for formation in formations
+        ])
+        self.env['ange.employee.equipement'].create([
+            {'employee_id': employee.id, 'equipement_id': equipement.id}
+            for __ in range(nb_lignes)
+        ])
+        self.env['visite.medicale'].with_context(tracking_disable=True).create([
+            {'employee_id': employee.id, 'date': '2024-01-01'}
+            for __ in range(nb_lignes)
+        ])
+        self.env.flush_all()
+        return employee
+
+    def _measure_form_open(self, employee, specification):
+        """Lire le formulaire de l'employé et retourner le nombre de requêtes"""
+        queries, __ = self._measure(
+            f"Ouverture du formulaire employé ({len(employee.formation_ids)} lignes par onglet)",
+            lambda: employee.web_read(specification),
+        )
+        return queries
+
+    def test_form_open_query_count_independent_of_history(self):
+        """Compteurs groupés et listes paginées : nombre de requêtes constant"""
+        specification = self._form_specification()
+        short_history = self._measure_form_open(self._create_employee(5), specification)
+        long_history = self._measure_form_open(self._create_employee(150), specification)
+        self.assertEqual(short_history, long_history)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestMatriculeSearch(TransactionCase):
+    """Recherche d'employé par matricule agent, sans tenir compte de la casse"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agent_paris, cls.agent_lyon, cls.agent_autre = cls.env['hr.employee'].create([
+            {'name': 'Agent Nord', 'matricule_agent': 'PAR-0042'},
+            {'name': 'Agent Sud', 'matricule_agent': 'par-0043'},
+            {'name': 'Agent Est', 'matricule_agent': 'LYO_001'},
+        ])
+
+    def _name_search(self, value, operator='ilike'):
+        return self.env['hr.employee'].search([('display_name', operator, value)])
+
+    def test_prefix_ignores_case(self):
+        """Le préfixe saisi trouve les matricules quelle que soit leur casse"""
+        self.assertEqual(self._name_search('Par-004'), self.agent_paris | self.agent_lyon)
+        self.assertEqual(self._name_search('par-0043'), self.agent_lyon)
+
+    def test_exact_match(self):
+        """L'opérateur '=' ne retient que le matricule complet"""
+        self.assertEqual(self._name_search('par-0042', '='), self.agent_paris)
+        self.assertFalse(self._name_search('PAR-004', '='))
+
+    def test_wildcards_are_literal(self):
+        """Les caractères _ et % du matricule saisi ne sont pas des jokers"""
+        self.assertEqual(self._name_search('lyo_'), self.agent_autre)
+        self.assertFalse(self._name_search('LYO%'))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRecyclageDates(TransactionCase):
+    """La mise à jour SQL des dates de recyclage suit la sémantique de relativedelta"""
+
+    # Fins de mois et années bissextiles (dates futures : aucune ligne n'est échue)
+    DATES_FIN = [
+        date(2096, 1, 31),
+        date(2096, 2, 29),
+        date(2096, 3, 31),
+        date(2096, 8, 31),
+        date(2096, 12, 31),
+        date(2097, 1, 29),
+    ]
+
+    def test_sql_update_matches_relativedelta(self):
+        """Changer la durée de recyclage donne les mêmes dates que relativedelta"""
+        formation = self.env['hr.formation'].create({'name': 'Formation fin de mois'})
+        employees = self.env['hr.employee'].create([
+            {'name': f'Agent {index}'} for index in range(len(self.DATES_FIN))
+        ])
+        lignes = self.env['ange.employee.formation'].create([
+            {
+                'employee_id': employee.id,
+                'formation_id': formation.id,
+                'date_debut': date_fin - relativedelta(days=10),
+                'date_fin': date_fin,
+                'statut': 'terminee',
+            }
+            for employee, date_fin in zip(employees, self.DATES_FIN)
+        ])
+
+        for duree in (1, 6, 12, 13, 48):
+            formation.write({'duree_avant_recyclage': duree})
+            self.env.invalidate_all()
+            for ligne in lignes:
+                self.assertEqual(
+                    ligne.date_recyclage,
+                    ligne.date_fin + relativedelta(months=duree),
+                    f"{ligne.date_fin} + {duree} mois",
+                )
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+
+from .common import BenchmarkCase
+
+
+class RenameBenchmarkCase(BenchmarkCase):
+    """Mesure du renommage d'une formation et d'un équipement détenus par N employés"""
+
+    def _create_assignments(self, nb_employees):
+        """Créer une formation et un équipement affectés à nb_employees employés"""
+        employees = self.env['hr.employee'].create([
+            {'name': f'Agent {index}'} for index in range(nb_employees)
+        ])
+        formation = self.env['hr.formation'].create({'name': 'Formation SSIAP'})
+        equipement = self.env['ange.equipement'].create({
+            'name': 'Gilet pare-balles',
+            'periode_renouvellement': 12,
+        })
+        self.env['ange.employee.formation'].create([
+            {'employee_id': employee.id, 'formation_id': formation.id}
+            for employee in employees
+        ])
+        self.env['ange.employee.equipement'].create([
+            {'employee_id': employee.id, 'equipement_id': equipement.id}
+            for employee in employees
+        ])
+        self.env.flush_all()
+        return formation, equipement
+
+    def _benchmark(self, nb_employees):
+        """Nombre de requêtes du renommage de la formation et de l'équipement, par modèle"""
+        results = {}
+        for record in self._create_assignments(nb_employees):
+            results[record._name], __ = self._measure(
+                f"Renommage {record._name} avec {nb_employees} affectation(s)",
+                lambda: record.write({'name': f'{record.name} (renommé)'}),
+            )
+        return results
+
+
+@tagged('post_install', '-at_install')
+class TestRenamePerformance(RenameBenchmarkCase):
+
+    def test_rename_query_count_independent_of_assignments(self):
+        """Le renommage ne réécrit pas les affectations : nombre de requêtes constant"""
+        few = self._benchmark(5)
+        many = self._benchmark(200)
+        self.assertEqual(few, many)
+
+
+@tagged('-standard', 'ange_sec_employee_bench')
+class TestRenameBenchmark(RenameBenchmarkCase):
+    """Banc d'essai à grande échelle, à lancer avec --test-tags ange_sec_employee_bench"""
+
+    NB_AFFECTATIONS = 100_000
+
+    def test_rename_at_scale(self):
+        """Renommer une formation et un équipement détenus par 100 000 employés"""
+        reference = self._benchmark(5)
+        at_scale = self._benchmark(self.NB_AFFECTATIONS)
+        self.assertEqual(reference, at_scale)
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+from . import employee_selection_mixin
+from . import formation_enrollment_wizard
+from . import compliance_matrix_export_wizard
+from . import equipement_kit_issue_wizard
+from . import employee_import_wizard
+from . import roster_generate_wizard
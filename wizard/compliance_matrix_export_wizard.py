@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import codecs
+import csv
+
+import xlsxwriter
+
+from odoo import models, fields, _
+from odoo.tools import SQL
+
+# Nombre de lignes lues à chaque FETCH sur le curseur serveur
+FETCH_SIZE = 2000
+
+
+class ComplianceMatrixExportWizard(models.TransientModel):
+    """Export de la matrice de conformité employés × formations"""
+    _name = 'ange.compliance.matrix.export.wizard'
+    _inherit = 'ange.employee.selection.mixin'
+    _description = 'Export de la matrice de conformité des formations'
+
+    formation_ids = fields.Many2many(
+        'hr.formation',
+        string='Formations',
+        help='Formations à exporter en colonnes (toutes les formations actives si vide)'
+    )
+
+    format_export = fields.Selection([
+        ('xlsx', 'Excel (XLSX)'),
+        ('csv', 'CSV'),
+    ], string='Format', required=True, default='xlsx')
+
+    def action_export(self):
+        """Lancer le téléchargement de la matrice"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/ange_sec_employee/compliance_matrix/{self.id}',
+            'target': 'self',
+        }
+
+    def _get_matrix_formations(self):
+        """Formations affichées en colonnes, dans l'ordre des colonnes"""
+        self.ensure_one()
+        return self.formation_ids.sorted('name') or self.env['hr.formation'].search([])
+
+    def _iter_matrix_rows(self, formations):
+        """Générer les lignes de la matrice (une par employé) en mémoire bornée
+
+        Les affectations sont lues triées par employé via un curseur serveur
+        PostgreSQL, puis pivotées à la volée : une ligne n'est émise qu'une
+        fois toutes les affectations de l'employé lues.
+        """
+        self.ensure_one()
+        self.env['hr.employee'].check_access('read')
+        self.env['ange.employee.formation'].check_access('read')
+
+        colonnes = {formation.id: index for index, formation in enumerate(formations)}
+        libelles_statut = dict(self.env['ange.employee.formation']._fields['statut'].selection)
+        departements = {
+            department.id: department.name
+            for department in self.env['hr.department'].with_context(active_test=False).search([])
+        }
+        employee_query = self.env['hr.employee']._search(self._get_employee_domain())
+
+        self.env['ange.employee.formation'].flush_model(['employee_id', 'formation_id', 'statut', 'date_recyclage'])
+        self.env['hr.employee'].flush_model(['name', 'matricule_agent', 'department_id'])
+
+        cr = self.env.cr
+        cr.execute(SQL(
+            """
+            DECLARE ange_compliance_matrix NO SCROLL CURSOR FOR
+                SELECT e.id, e.name, e.matricule_agent, e.department_id,
+                       ef.formation_id, ef.statut, ef.date_recyclage
+                  FROM hr_employee e
+             LEFT JOIN ange_employee_formation ef
+                    ON ef.employee_id = e.id
+                   AND ef.formation_id IN %s
+                 WHERE e.id IN %s
+              ORDER BY e.name, e.id
+            """,
+            tuple(colonnes) or (None,),
+            employee_query.subselect(),
+        ))
+        try:
+            ligne = None
+            employee_courant = None
+            while True:
+                cr.execute("FETCH FORWARD %s FROM ange_compliance_matrix", [FETCH_SIZE])
+                rows = cr.fetchall()
+                if not rows:
+                    break
+                for employee_id, name, matricule, department_id, formation_id, statut, date_recyclage in rows:
+                    if employee_id != employee_courant:
+                        if ligne is not None:
+                            yield ligne
+                        employee_courant = employee_id
+                        ligne = [matricule or '', name or '', departements.get(department_id, '')]
+                        ligne += [''] * (2 * len(colonnes))
+                    if formation_id:
+                        index = 3 + 2 * colonnes[formation_id]
+                        ligne[index] = libelles_statut.get(statut, statut or '')
+                        ligne[index + 1] = fields.Date.to_string(date_recyclage) if date_recyclage else ''
+            if ligne is not None:
+                yield ligne
+        finally:
+            cr.execute("CLOSE ange_compliance_matrix")
+
+    def _get_matrix_header(self, formations):
+        """Ligne d'en-tête de la matrice"""
+        header = [_('Matricule'), _('Employé'), _('Département')]
+        for formation in formations:
+            header += [formation.name, _('%s - Recyclage') % formation.name]
+        return header
+
+    def _write_matrix(self, fileobj):
+        """Écrire la matrice dans un fichier binaire ouvert
+
+        :return: tuple (nom du fichier, type MIME)
+        """
+        self.ensure_one()
+        formations = self._get_matrix_formations()
+        header = self._get_matrix_header(formations)
+        rows = self._iter_matrix_rows(formations)
+        filename = f"matrice_conformite_{fields.Date.to_string(fields.Date.context_today(self))}"
+
+        if self.format_export == 'csv':
+            fileobj.write(codecs.BOM_UTF8)
+            writer = csv.writer(codecs.getwriter('utf-8')(fileobj), delimiter=';')
+            writer.writerow(header)
+            writer.writerows(rows)
+            return f'{filename}.csv', 'text/csv;charset=utf-8'
+
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        worksheet = workbook.add_worksheet(_('Conformité'))
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, header, bold)
+        worksheet.freeze_panes(1, 3)
+        for row_index, row in enumerate(rows, start=1):
+            worksheet.write_row(row_index, 0, row)
+        workbook.close()
+        return f'{filename}.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import csv
+import io
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+from ..models.ange_settings import get_ange_settings
+
+_logger = logging.getLogger(__name__)
+
+# Colonnes reconnues dans le fichier (en plus de matricule_agent, obligatoire)
+CHAR_COLUMNS = ('name', 'identification_id', 'passport_id')
+DATE_COLUMNS = ('date_validite_cni', 'date_validite_carte_sejour')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+
+
+class EmployeeImportWizard(models.TransientModel):
+    """Import en masse des données d'identité et matricules des agents"""
+    _name = 'ange.employee.import.wizard'
+    _description = 'Import des données d\'identité des agents'
+
+    fichier = fields.Binary(
+        string='Fichier CSV',
+        required=True,
+        help='Colonnes : matricule_agent (obligatoire), name, identification_id, passport_id, '
+             'date_validite_cni, date_validite_carte_sejour'
+    )
+
+    nom_fichier = fields.Char(string='Nom du fichier')
+
+    separateur = fields.Selection([
+        (';', 'Point-virgule (;)'),
+        (',', 'Virgule (,)'),
+    ], string='Séparateur', required=True, default=';')
+
+    encodage = fields.Selection([
+        ('utf-8-sig', 'UTF-8'),
+        ('cp1252', 'Windows-1252 (Excel)'),
+        ('latin-1', 'ISO-8859-1'),
+    ], string='Encodage', required=True, default='utf-8-sig',
+        help='Encodage du fichier CSV ; Excel enregistre généralement en Windows-1252')
+
+    creer_manquants = fields.Boolean(
+        string='Créer les employés inconnus',
+        default=False,
+        help='Créer un employé pour chaque matricule inconnu (la colonne name est alors obligatoire)'
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    state = fields.Selection([
+        ('brouillon', 'Brouillon'),
+        ('termine', 'Terminé')
+    ], string='État', default='brouillon', readonly=True)
+
+    nb_lignes = fields.Integer(string='Lignes lues', readonly=True)
+    nb_mis_a_jour = fields.Integer(string='Employés mis à jour', readonly=True)
+    nb_crees = fields.Integer(string='Employés créés', readonly=True)
+    nb_erreurs = fields.Integer(string='Lignes en erreur', readonly=True)
+
+    rapport_erreurs = fields.Binary(string='Rapport d\'erreurs', readonly=True, attachment=False)
+    nom_rapport = fields.Char(string='Nom du rapport', readonly=True)
+
+    def action_import(self):
+        """Importer le fichier par lots et produire le rapport d'erreurs"""
+        self.ensure_one()
+        stats = {'lignes': 0, 'mis_a_jour': 0, 'crees': 0}
+        erreurs = []
+        with io.TextIOWrapper(self._open_fichier(), encoding=self.encodage, newline='') as stream:
+            try:
+                self._import_stream(stream, stats, erreurs)
+            except UnicodeDecodeError:
+                encodage = dict(self._fields['encodage'].selection)[self.encodage]
+                raise UserError(_(
+                    "Le fichier n'est pas encodé en %s. Choisissez un autre encodage "
+                    "ou enregistrez le fichier en CSV UTF-8."
+                ) % encodage)
+
+        self.write({
+            'state': 'termine',
+            'nb_lignes': stats['lignes'],
+            'nb_mis_a_jour': stats['mis_a_jour'],
+            'nb_crees': stats['crees'],
+            'nb_erreurs': len(erreurs),
+            'rapport_erreurs': self._build_error_report(erreurs) if erreurs else False,
+            'nom_rapport': 'erreurs_import.csv' if erreurs else False,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _open_fichier(self):
+        """Ouvrir le fichier importé en flux binaire sans le charger en mémoire
+
+        Le fichier est lu directement dans le filestore ; à défaut (pièce
+        jointe stockée en base), depuis son contenu.
+        """
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'fichier'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw or b'')
+
+    def _import_stream(self, stream, stats, erreurs):
+        """Lire le fichier ligne à ligne et l'importer par lots de taille_lot_cron lignes"""
+        reader = csv.DictReader(stream, delimiter=self.separateur)
+        if not reader.fieldnames or 'matricule_agent' not in reader.fieldnames:
+            raise UserError(_('Le fichier doit contenir une colonne "matricule_agent".'))
+
+        batch_size = get_ange_settings(self.env)['taille_lot_cron']
+        matricules_vus = set()
+
+        # La ligne 1 est l'en-tête
+        for chunk in split_every(batch_size, enumerate(reader, start=2)):
+            stats['lignes'] += len(chunk)
+            lignes = []
+            for numero, row in chunk:
+                matricule, vals, erreur = self._parse_row(row)
+                if not erreur and matricule in matricules_vus:
+                    erreur = _('Matricule présent plusieurs fois dans le fichier')
+                if erreur:
+                    erreurs.append((numero, matricule, erreur))
+                    continue
+                matricules_vus.add(matricule)
+                lignes.append((numero, matricule, vals))
+            self._import_chunk(lignes, stats, erreurs)
+
+    def _parse_row(self, row):
+        """Convertir une ligne du fichier en valeurs d'écriture
+
+        :return: tuple (matricule, vals, message d'erreur ou False)
+        """
+        matricule = (row.get('matricule_agent') or '').strip()
+        if not matricule:
+            return matricule, {}, _('Matricule agent manquant')
+
+        vals = {}
+        for column in CHAR_COLUMNS:
+            if row.get(column) is not None:
+                vals[column] = row[column].strip() or False
+        for column in DATE_COLUMNS:
+            if row.get(column) is None:
+                continue
+            raw = row[column].strip()
+            if not raw:
+                vals[column] = False
+                continue
+            for date_format in DATE_FORMATS:
+                try:
+                    vals[column] = datetime.strptime(raw, date_format).date()
+                    break
+                except ValueError:
+                    continue
+            else:
+                return matricule, {}, _('Date invalide pour %s : %s') % (column, raw)
+        return matricule, vals, False
+
+    def _import_chunk(self, lignes, stats, erreurs):
+        """Écrire un lot : une recherche par lot, puis écritures et créations groupées
+
+        Seuls les employés recevant exactement les mêmes valeurs partagent un
+        write ; les autres sont écrits un à un, les mises à jour restant en
+        cache jusqu'au vidage en base à la fin du lot.
+
+        Si le lot échoue en base, il est rejoué ligne par ligne pour isoler les
+        lignes fautives sans interrompre l'import du reste du fichier.
+        """
+        if not lignes:
+            return
+        Employee = self.env['hr.employee'].with_company(self.company_id)
+        employees = Employee.search_fetch([
+            ('matricule_agent', 'in', [matricule for __, matricule, __ in lignes]),
+            ('company_id', '=', self.company_id.id),
+        ], ['matricule_agent'])
+        par_matricule = {employee.matricule_agent: employee for employee in employees}
+
+        a_ecrire = []
+        a_creer = []
+        for numero, matricule, vals in lignes:
+            employee = par_matricule.get(matricule)
+            if employee:
+                a_ecrire.append((numero, matricule, employee, vals))
+            elif not self.creer_manquants:
+                erreurs.append((numero, matricule, _('Aucun employé avec ce matricule')))
+            elif not vals.get('name'):
+                erreurs.append((numero, matricule, _('Colonne name obligatoire pour créer un employé')))
+            else:
+                a_creer.append((numero, matricule, dict(vals, matricule_agent=matricule, company_id=self.company_id.id)))
+
+        groupes = defaultdict(lambda: Employee)
+        for __, __, employee, vals in a_ecrire:
+            groupes[tuple(sorted(vals.items()))] |= employee
+
+        try:
+            with self.env.cr.savepoint():
+                for vals, groupe in groupes.items():
+                    groupe.write(dict(vals))
+                Employee.create([vals for __, __, vals in a_creer])
+            stats['mis_a_jour'] += len(a_ecrire)
+            stats['crees'] += len(a_creer)
+            return
+        except Exception:
+            _logger.info("Lot d'import en échec, reprise ligne par ligne", exc_info=True)
+            self.env.invalidate_all()
+
+        for numero, matricule, employee, vals in a_ecrire:
+            if self._import_row(numero, matricule, erreurs, employee.write, vals):
+                stats['mis_a_jour'] += 1
+        for numero, matricule, vals in a_creer:
+            if self._import_row(numero, matricule, erreurs, Employee.create, vals):
+                stats['crees'] += 1
+
+    def _import_row(self, numero, matricule, erreurs, method, vals):
+        """Appliquer une ligne isolément ; consigner l'erreur éventuelle"""
+        try:
+            with self.env.cr.savepoint():
+                method(vals)
+            return True
+        except Exception as e:
+            self.env.invalidate_all()
+            erreurs.append((numero, matricule, str(e)))
+            return False
+
+    def _build_error_report(self, erreurs):
+        """Construire le rapport d'erreurs CSV (encodé en base64)"""
+        output = io.StringIO()
+        writer = csv.writer(output, delimiter=self.separateur)
+        writer.writerow([_('Ligne'), _('Matricule'), _('Erreur')])
+        writer.writerows(sorted(erreurs))
+        return base64.b64encode(output.getvalue().encode('utf-8-sig'))
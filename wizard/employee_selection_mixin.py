@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+
+class EmployeeSelectionMixin(models.AbstractModel):
+    """Critères communs de sélection d'employés pour les assistants de masse"""
+    _name = 'ange.employee.selection.mixin'
+    _description = 'Sélection d\'employés par critères'
+
+    department_ids = fields.Many2many(
+        'hr.department',
+        string='Départements',
+        help='Limiter aux employés de ces départements'
+    )
+
+    faction_ids = fields.Many2many(
+        'hr.faction',
+        string='Factions',
+        help='Limiter aux employés de ces factions'
+    )
+
+    category_ids = fields.Many2many(
+        'hr.employee.category',
+        string='Étiquettes',
+        help='Limiter aux employés portant ces étiquettes'
+    )
+
+    employee_ids = fields.Many2many(
+        'hr.employee',
+        string='Employés',
+        help='Limiter à ces employés'
+    )
+
+    def _get_employee_domain(self):
+        """Construire le domaine des employés à partir des critères saisis"""
+        self.ensure_one()
+        domain = []
+        if self.department_ids:
+            domain.append(('department_id', 'in', self.department_ids.ids))
+        if self.faction_ids:
+            domain.append(('faction_id', 'in', self.faction_ids.ids))
+        if self.category_ids:
+            domain.append(('category_ids', 'in', self.category_ids.ids))
+        if self.employee_ids:
+            domain.append(('id', 'in', self.employee_ids.ids))
+        return domain
+
+    def _get_required_employee_domain(self):
+        """Domaine des employés sélectionnés ; au moins un critère est exigé"""
+        domain = self._get_employee_domain()
+        if not domain:
+            raise UserError(_('Veuillez sélectionner au moins un critère (département, faction, étiquette ou employé).'))
+        return domain
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, _
+
+
+class EquipementKitIssueWizard(models.TransientModel):
+    """Assistant de distribution d'un kit d'équipements à un groupe d'employés"""
+    _name = 'ange.equipement.kit.issue.wizard'
+    _inherit = 'ange.employee.selection.mixin'
+    _description = 'Distribution d\'un kit d\'équipements'
+
+    kit_id = fields.Many2one(
+        'ange.equipement.kit',
+        string='Kit',
+        required=True,
+        help='Kit d\'équipements à distribuer'
+    )
+
+    date_remise = fields.Date(
+        string='Date de remise',
+        required=True,
+        default=fields.Date.today,
+        help='Date de remise des équipements du kit'
+    )
+
+    def action_issue(self):
+        """Distribuer le kit aux employés sélectionnés"""
+        self.ensure_one()
+        domain = self._get_required_employee_domain()
+
+        employees = self.env['hr.employee'].search(domain)
+        assignments = self.kit_id._issue_to_employees(employees, self.date_remise)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Dotation - %s') % self.kit_id.name,
+            'res_model': 'ange.employee.equipement',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', assignments.ids)],
+        }
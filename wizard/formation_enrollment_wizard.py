@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, _
+
+
+class FormationEnrollmentWizard(models.TransientModel):
+    """Assistant d'inscription en masse d'employés à une formation"""
+    _name = 'ange.formation.enrollment.wizard'
+    _inherit = 'ange.employee.selection.mixin'
+    _description = 'Inscription en masse à une formation'
+
+    formation_id = fields.Many2one(
+        'hr.formation',
+        string='Formation',
+        required=True,
+        help='Formation à laquelle inscrire les employés'
+    )
+
+    def action_enroll(self):
+        """Inscrire les employés sélectionnés à la formation"""
+        self.ensure_one()
+        domain = self._get_required_employee_domain()
+
+        enrollments = self.formation_id._enroll_employees(domain)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Inscription terminée'),
+                'message': _('%s employé(s) inscrit(s) à la formation %s.') % (len(enrollments), self.formation_id.name),
+                'type': 'success',
+                'sticky': False,
+                'next': self.formation_id.action_view_employee_formations(),
+            }
+        }
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+
+class RosterGenerateWizard(models.TransientModel):
+    """Assistant de génération du planning des vacations à partir des factions"""
+    _name = 'ange.roster.generate.wizard'
+    _inherit = 'ange.employee.selection.mixin'
+    _description = 'Génération du planning des vacations'
+
+    date_debut = fields.Date(
+        string='Du',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    date_fin = fields.Date(
+        string='Au',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    faction_id = fields.Many2one(
+        'hr.faction',
+        string='Faction imposée',
+        help='Planifier tous les employés sélectionnés sur cette faction plutôt que sur leur faction par défaut'
+    )
+
+    @api.constrains('date_debut', 'date_fin')
+    def _check_dates(self):
+        """Vérifier la cohérence de la période"""
+        for wizard in self:
+            if wizard.date_fin < wizard.date_debut:
+                raise ValidationError(_('La date de fin doit être postérieure à la date de début.'))
+
+    def action_generate(self):
+        """Générer les vacations des employés sélectionnés sur la période"""
+        self.ensure_one()
+        domain = self._get_required_employee_domain()
+
+        employees = self.env['hr.employee'].search_fetch(domain, ['faction_id', 'tz'])
+        shifts = self.env['ange.roster.shift']._generate_shifts(
+            employees, self.date_debut, self.date_fin, faction=self.faction_id
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Planning généré'),
+                'message': _('%s vacation(s) créée(s).') % len(shifts),
+                'type': 'success',
+                'sticky': False,
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'name': _('Vacations'),
+                    'res_model': 'ange.roster.shift',
+                    'view_mode': 'list,calendar,form',
+                    'domain': [
+                        ('date_service', '>=', self.date_debut),
+                        ('date_service', '<=', self.date_fin),
+                    ],
+                },
+            }
+        }